@@ -1,10 +1,12 @@
 import streamlit as st
-import pandas as pd
 import gspread
+from gspread.utils import DateTimeOption, ValueRenderOption
 from oauth2client.service_account import ServiceAccountCredentials
-import datetime
 import matplotlib.pyplot as plt
 
+from kasva.data import KOLOM_NOMINAL_GAGAL, grid_to_ledger
+from kasva.ledger import hitung_sisa_saldo
+
 # ------------------------
 # AUTH
 # ------------------------
@@ -19,8 +21,13 @@ client = gspread.authorize(creds)
 # LOAD DATA
 # ------------------------
 sheet = client.open("KASVA 1.0 - Aplikasi Cash Flow BKPSDM").worksheet("Data")
-data = sheet.get_all_records()
-df = pd.DataFrame(data)
+# Grid mentah langsung jadi kolom bertipe (tanpa get_all_records → dict per baris).
+# UNFORMATTED_VALUE: UMK/SPJ datang sebagai angka, tanggal tetap teks tampilan sheet.
+grid = sheet.get_values(
+    value_render_option=ValueRenderOption.unformatted,
+    date_time_render_option=DateTimeOption.formatted_string,
+)
+df = grid_to_ledger(grid)
 
 # cek kolom wajib
 required = ["Tanggal", "Kategori", "Uraian", "UMK", "SPJ"]
@@ -29,49 +36,10 @@ if missing:
     st.error(f"Kolom hilang di sheet: {missing}")
     st.stop()
 
-# ------------------------
-# PARSE TANGGAL (aman)
-# ------------------------
-def parse_tanggal(val):
-    if pd.isna(val) or str(val).strip() == "":
-        return pd.NaT
-    # kalau sudah datetime/date
-    if isinstance(val, (datetime.date, datetime.datetime, pd.Timestamp)):
-        return pd.to_datetime(val)
-    s = str(val).strip()
-    # coba beberapa format eksplisit yang umum di sheet (dd/mm/yyyy, dd-mm-yyyy, dd.mm.yyyy)
-    fmts = ["%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y-%m-%d", "%Y/%m/%d"]
-    for f in fmts:
-        try:
-            return pd.to_datetime(datetime.datetime.strptime(s, f))
-        except Exception:
-            pass
-    # fallback: biarkan pandas parse tapi dengan dayfirst=True
-    try:
-        return pd.to_datetime(s, dayfirst=True, errors="coerce")
-    except Exception:
-        return pd.NaT
-
-df["Tanggal"] = df["Tanggal"].apply(parse_tanggal)
-
-# ------------------------
-# BERSIHKAN UANG jadi numeric
-# ------------------------
-def clean_money(s: pd.Series) -> pd.Series:
-    return (
-        s.astype(str)
-         .str.replace("Rp", "", regex=False)
-         .str.replace(" ", "", regex=False)
-         .str.replace(".", "", regex=False)
-         .str.replace(",", ".", regex=False)
-         .str.strip()
-         .replace("", "0")
-         .pipe(pd.to_numeric, errors="coerce")
-         .fillna(0.0)
-    )
-
-df["UMK"] = clean_money(df["UMK"])
-df["SPJ"] = clean_money(df["SPJ"])
+# tanggal terisi tapi tidak terbaca (NaT) → dilaporkan, bukan diam-diam hilang
+tanggal_gagal = df[df["Tanggal"].isna()]
+# begitu juga UMK/SPJ yang tidak terbaca (dihitung 0)
+nominal_gagal = df[df[KOLOM_NOMINAL_GAGAL]]
 
 # ------------------------
 # HITUNG RUNNING SALDO per kategori
@@ -80,21 +48,8 @@ df["SPJ"] = clean_money(df["SPJ"])
 #   baris i>1 = (sisa_prev - SPJ_i) + UMK_i
 # ------------------------
 df = df.sort_values(by=["Kategori", "Tanggal"], na_position="last").reset_index(drop=True)
-df["Sisa Saldo"] = 0.0
-
-for kat in df["Kategori"].dropna().unique():
-    mask = df["Kategori"] == kat
-    idxs = df[mask].sort_values("Tanggal", na_position="last").index.tolist()
-    prev_sisa = None
-    for i, idx in enumerate(idxs):
-        umk = float(df.at[idx, "UMK"])
-        spj = float(df.at[idx, "SPJ"])
-        if i == 0:
-            sisa = umk  # baris pertama = UMK pertama
-        else:
-            sisa = (prev_sisa - spj) + umk
-        df.at[idx, "Sisa Saldo"] = sisa
-        prev_sisa = sisa
+df["Sisa Saldo"] = hitung_sisa_saldo(df, by="Kategori", mode="umk_awal")
+df.loc[df["Kategori"].isna(), "Sisa Saldo"] = 0.0
 
 # ------------------------
 # DASHBOARD
@@ -102,6 +57,12 @@ for kat in df["Kategori"].dropna().unique():
 st.set_page_config(page_title="Dashboard BKPSDM", layout="wide")
 st.title("📊 Dashboard Cash Flow BKPSDM")
 st.caption("Data live dari Google Sheets — tanggal ditampilkan dd-mm-yyyy")
+if not tanggal_gagal.empty:
+    st.warning(f"{len(tanggal_gagal)} baris punya Tanggal yang tidak terbaca "
+               f"(baris sheet: {', '.join(str(i + 2) for i in tanggal_gagal.index)})")
+if not nominal_gagal.empty:
+    st.warning(f"{len(nominal_gagal)} baris punya UMK/SPJ yang tidak terbaca, dihitung 0 "
+               f"(baris sheet: {', '.join(str(i + 2) for i in nominal_gagal.index)})")
 
 # filter kategori
 kategori_list = ["Semua"] + sorted(df["Kategori"].dropna().unique().tolist())
@@ -1,10 +1,10 @@
 import streamlit as st
-import pandas as pd
-import gspread, os, json
-from google.oauth2.service_account import Credentials
-from datetime import datetime
+import os, json
+from datetime import date, datetime
 from streamlit_extras.metric_cards import style_metric_cards
-import altair as alt
+
+from kasva import ekspor, grafik, pantau, storage, tampil
+from kasva.ledger import hitung_sisa_saldo
 
 # ------------------------
 # SETUP PAGE (must be first)
@@ -15,27 +15,12 @@ st.set_page_config(page_title="Dashboard BKPSDM", layout="wide")
 if "page" not in st.session_state:
     st.session_state["page"] = "dashboard"
 
-# --- Auth ke Google Sheet Lokal / Cloud ---
-scope = ["https://www.googleapis.com/auth/spreadsheets",
-         "https://www.googleapis.com/auth/drive"]
-creds = None
-try:
-    # --- Cloud (Streamlit Secrets) ---
-    creds = Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"], scopes=scope
-    )
-except Exception:
-    # --- Lokal (File JSON) ---
-    creds = Credentials.from_service_account_file(
-        r"C:/Users/MyBook Hype AMD/Videos/Dashboard Arus Kas/proven-mystery-471102-k6-0d7bdda0bcd4.json",
-        scopes=scope
-    )
+# --- Pantau kinerja rerun ini (durasi per tahap + panggilan Sheets API, lihat kasva/pantau.py) ---
+pantau.mulai(st.session_state["page"])
 
-client = gspread.authorize(creds)
-# Konsistensi variabel worksheet di seluruh halaman
-sheet_data = client.open("KASVA 1.0 - Aplikasi Cash Flow BKPSDM").worksheet("Data")
-sheet_kasir = client.open("KASVA 1.0 - Aplikasi Cash Flow BKPSDM").worksheet("Data Kasir")
-sheet_tw = client.open("KASVA 1.0 - Aplikasi Cash Flow BKPSDM").worksheet("Tenggat Waktu")
+# --- Backend penyimpanan (Google Sheets / SQLite, lihat kasva/storage.py) ---
+with pantau.tahap("backend"):
+    backend = storage.get_backend()
 
 # ========================
 # HEADER STYLING
@@ -140,7 +125,8 @@ if st.session_state.get("page") == "login":
 if st.session_state.get("page") == "tambah_data":
     st.subheader("➕ Tambah Data Transaksi")
 
-    kasir_list = sheet_kasir.col_values(2)[1:]
+    with pantau.tahap("kasir"):
+        kasir_list = backend.list_kasir()
 
     col1, col2, col3 = st.columns([3, 3, 2])
     with col1:
@@ -163,19 +149,21 @@ if st.session_state.get("page") == "tambah_data":
         keterangan = st.text_area("Keterangan", placeholder="Opsional...")
         submit = st.form_submit_button("💾 Simpan Data")
 
-    # Ambil data untuk preview 5 data terakhir
-    raw_data = sheet_data.get_all_values()
-    header = raw_data[0][1:8]  # Kolom B-H
-    rows = [r[1:8] for r in raw_data[1:]]
-    df_preview = pd.DataFrame(rows, columns=header)
-
-    if not df_preview.empty and "Kategori" in df_preview.columns and "Kasir" in df_preview.columns:
-        df_filter = df_preview[(df_preview["Kategori"] == kategori) & (df_preview["Kasir"] == kasir)].tail(5)
-        st.subheader(f"📋 5 Transaksi Terakhir ({kategori} - {kasir})")
-        if not df_filter.empty:
-            st.dataframe(df_filter, use_container_width=True)
-        else:
-            st.info("ℹ️ Belum ada data untuk kombinasi kategori dan kasir ini.")
+    # Ambil data untuk preview 5 data terakhir (filter dikerjakan backend)
+    with pantau.tahap("preview"):
+        df_filter = backend.load_ledger(kategori=kategori, kasir=kasir).tail(5).copy()
+        df_filter["Tanggal"] = df_filter["Tanggal"].dt.strftime("%d-%m-%Y")
+
+        # Status antrian tulis (transaksi yang belum masuk ke Spreadsheet)
+        antre = backend.queue_depth()
+    if antre:
+        st.caption(f"⏳ {antre} transaksi menunggu dikirim ke Spreadsheet")
+
+    st.subheader(f"📋 5 Transaksi Terakhir ({kategori} - {kasir})")
+    if not df_filter.empty:
+        st.dataframe(df_filter, use_container_width=True)
+    else:
+        st.info("ℹ️ Belum ada data untuk kombinasi kategori dan kasir ini.")
 
     if submit:
         if not uraian:
@@ -185,50 +173,34 @@ if st.session_state.get("page") == "tambah_data":
         elif jenis_input == "SPJ" and spj == 0:
             st.error("⚠️ Nominal SPJ harus lebih dari 0!")
         else:
-            next_row = len(raw_data) + 1
-            # Simpan tanggal dengan format standar Indonesia DD-MM-YYYY agar sinkron saat load
-            tgl_str = tanggal.strftime("%d-%m-%Y")
-            sheet_data.update(
-                f"B{next_row}:H{next_row}",
-                [[tgl_str, kategori, kasir, uraian, umk, spj, keterangan]]
-            )
-            st.success("✅ Data berhasil disimpan ke Spreadsheet!")
+            with pantau.tahap("simpan"):
+                backend.submit_transaction(tanggal, kategori, kasir, uraian, umk, spj, keterangan)
+            st.success("✅ Data berhasil disimpan, sedang dikirim ke Spreadsheet!")
             st.rerun()
 
 # ========================
 # HALAMAN DASHBOARD
 # ========================
 if st.session_state["page"] == "dashboard":
-    data = sheet_data.get_all_records()
-    df = pd.DataFrame(data)
-
-    # Clean Data
-    for col in ["UMK", "SPJ"]:
-        if col in df.columns:
-            df[col] = (
-                df[col].astype(str)
-                .str.replace("Rp", "", regex=False)
-                .str.replace(".", "", regex=False)
-                .str.replace(",", "", regex=False)
-                .str.strip()
-                .replace("", "0")
-                .astype(float)
-            )
-
-    df["Tanggal"] = pd.to_datetime(df["Tanggal"], errors="coerce", dayfirst=True)
-    df = df.dropna(subset=["Tanggal"])
-
     # Filter Section
-   # Filter Section
+    # (daftar pilihan, filter, dan total dikerjakan backend → di SQLite jadi query ber-index)
     st.subheader("🔍 Filter Data")
-    df["Tahun"] = df["Tanggal"].dt.year
-    df["Kategori"] = df["Kategori"].replace("", pd.NA)
-    df["Kasir"] = df["Kasir"].replace("", pd.NA)
+
+    with pantau.tahap("opsi_filter"):
+        gagal = backend.invalid_rows()
+        nominal_gagal = backend.invalid_amounts()
+    if not gagal.empty:
+        with st.expander(f"⚠️ {len(gagal)} baris dilewati karena Tanggal tidak terbaca"):
+            st.dataframe(gagal, use_container_width=True, hide_index=True)
+    if not nominal_gagal.empty:
+        with st.expander(f"⚠️ {len(nominal_gagal)} baris punya UMK/SPJ tidak terbaca (dihitung 0)"):
+            st.dataframe(nominal_gagal, use_container_width=True, hide_index=True)
 
     c1, c2, c3 = st.columns(3)
     with c1:
         # 1. Ambil daftar unik tahun dari data
-        tahun_list = sorted(df["Tahun"].dropna().astype(int).unique().tolist())
+        with pantau.tahap("opsi_filter"):
+            tahun_list = backend.distinct("Tahun")
         options_tahun = ["Semua"] + tahun_list
         
         # 2. Ambil tahun berjalan saat ini (Dynamic)
@@ -243,22 +215,23 @@ if st.session_state["page"] == "dashboard":
         # 4. Set selectbox dengan index default tahun berjalan
         tahun = st.selectbox("📅 Tahun", options=options_tahun, index=default_index)
     with c2:
-        kategori_list = sorted(df["Kategori"].dropna().unique().tolist())
+        with pantau.tahap("opsi_filter"):
+            kategori_list = backend.distinct("Kategori")
         kategori = st.selectbox("📂 Kategori", options=["Semua"] + kategori_list)
 
-    df_temp = df.copy()
-    if tahun != "Semua":
-        df_temp = df_temp[df_temp["Tahun"] == tahun]
-    if kategori != "Semua":
-        df_temp = df_temp[df_temp["Kategori"] == kategori]
+    # "Semua" → None (tanpa filter) untuk backend
+    f_tahun = None if tahun == "Semua" else tahun
+    f_kategori = None if kategori == "Semua" else kategori
 
     with c3:
-        kasir_list = sorted(df_temp["Kasir"].dropna().unique().tolist())
+        with pantau.tahap("opsi_filter"):
+            kasir_list = backend.distinct("Kasir", tahun=f_tahun, kategori=f_kategori)
         kasir = st.selectbox("👤 Kasir", options=["Semua"] + kasir_list)
 
-    if kasir != "Semua":
-        df_temp = df_temp[df_temp["Kasir"] == kasir]
-    df_filtered = df_temp.copy()
+    f_kasir = None if kasir == "Semua" else kasir
+    with pantau.tahap("muat_ledger"):
+        # Ledger terfilter + status pelunasan UMK (dihitung backend atas seluruh ledger)
+        df_filtered = backend.load_ledger_tenggat(f_tahun, f_kategori, f_kasir)
 
     # --- FITUR 1: Transaksi Terakhir ---
     st.markdown("### 🧾 Transaksi Terakhir")
@@ -273,22 +246,22 @@ if st.session_state["page"] == "dashboard":
     else:
         st.info("Belum ada transaksi yang sesuai filter.")
 
-    # Hitung Saldo Berjalan
-    df_filtered = df_filtered.sort_values("Tanggal").reset_index(drop=True)
-    sisa = []
-    saldo = 0
-    for _, row in df_filtered.iterrows():
-        saldo = saldo - row["SPJ"] + row["UMK"]
-        sisa.append(saldo)
-    df_filtered["Sisa Saldo"] = sisa
+    # Hitung Saldo Berjalan, mulai dari saldo sebelum 1 Januari tahun terpilih
+    # (bukan dari 0) supaya sama dengan saldo di tampilan "Semua"
+    with pantau.tahap("saldo"):
+        df_filtered = df_filtered.sort_values("Tanggal").reset_index(drop=True)
+        saldo_awal = 0
+        if f_tahun is not None:
+            saldo_awal = backend.opening_balance(date(int(f_tahun), 1, 1), f_kategori, f_kasir)
+        df_filtered["Sisa Saldo"] = saldo_awal + hitung_sisa_saldo(df_filtered)
 
     def format_rupiah(x):
         return f"Rp{int(x):,}".replace(",", ".")
 
-    # Statistik
+    # Statistik (dari kubus rollup backend)
     st.subheader("📊 Statistik")
-    total_umk = df_filtered["UMK"].sum()
-    total_spj = df_filtered["SPJ"].sum()
+    with pantau.tahap("statistik"):
+        total_umk, total_spj = backend.totals(f_tahun, f_kategori, f_kasir)
     sisa_akhir = total_umk - total_spj
     realisasi = (total_spj / total_umk * 100) if total_umk > 0 else 0
 
@@ -304,90 +277,85 @@ if st.session_state["page"] == "dashboard":
     # Data Detail Table
     st.subheader("📋 Data Detail")
     if not df_filtered.empty:
-        df_tampil = df_filtered.copy()
-        df_tampil["Tenggat Waktu"] = pd.NaT
-
-        # Hitung Tenggat Otomatis
-        for (kategori_g, kasir_g), group in df_tampil.groupby(["Kategori", "Kasir"], group_keys=False):
-            group = group.sort_values(["Tanggal"]).reset_index()
-            for i, row in group.iterrows():
-                if row["UMK"] > 0:
-                    spj_setelah = group[(group.index > i) & (group["SPJ"] > 0) & (group["Tanggal"] >= row["Tanggal"])]
-                    if not spj_setelah.empty:
-                        continue
-                    tenggat = row["Tanggal"] + pd.Timedelta(days=21)
-                    df_tampil.loc[row["index"], "Tenggat Waktu"] = tenggat
-
-        df_tampil["Tanggal"] = df_tampil["Tanggal"].dt.strftime("%d/%m/%Y")
-        # Format Hari Indonesia Manual / Default String
-        df_tampil["Tenggat Waktu"] = df_tampil["Tenggat Waktu"].dt.strftime("%d/%m/%Y")
-        df_tampil["Tenggat Waktu"] = df_tampil["Tenggat Waktu"].fillna("-")
-
-        for col in ["UMK", "SPJ", "Sisa Saldo"]:
-            df_tampil[col] = df_tampil[col].apply(lambda x: f"Rp{int(x):,}".replace(",", ".") if pd.notna(x) and x != 0 else "-")
+        df_detail = df_filtered.copy()
+
+        # Tenggat Otomatis (FIFO: SPJ melunasi UMK terlama dulu, termasuk UMK tahun lalu),
+        # tenggat hanya tampil untuk UMK yang masih ada sisa belum di-SPJ-kan
+        df_detail["Tenggat Waktu"] = df_detail["Tenggat Waktu"].where(df_detail["Sisa UMK"] > 0)
 
         cols = ["Tanggal", "Kategori", "Kasir", "Uraian", "UMK", "SPJ"]
         if kategori != "Semua" or kasir != "Semua":
             cols.extend(["Sisa Saldo", "Tenggat Waktu"])
-        
-        st.dataframe(df_tampil[cols], use_container_width=True, hide_index=True)
+        df_detail = df_detail[cols]
+
+        # Sort/halaman di server: hanya baris halaman aktif yang diformat dan dikirim
+        # ke browser (statistik di atas tetap dari seluruh hasil filter)
+        with pantau.tahap("halaman_tabel"):
+            df_tampil = tampil.halaman(df_detail, key="detail", kolom_sort=cols)
+
+            df_tampil["Tanggal"] = df_tampil["Tanggal"].dt.strftime("%d/%m/%Y")
+            if "Tenggat Waktu" in cols:
+                # Format Hari Indonesia Manual / Default String
+                df_tampil["Tenggat Waktu"] = df_tampil["Tenggat Waktu"].dt.strftime("%d/%m/%Y")
+                df_tampil["Tenggat Waktu"] = df_tampil["Tenggat Waktu"].fillna("-")
+
+            # Rupiah tetap angka; format ribuan di browser (kasva.tampil), 0 → sel kosong
+            df_tampil = tampil.kosongkan_nol(df_tampil)
+
+        # st.dataframe = serialisasi Arrow payload ke browser
+        with pantau.tahap("render_tabel"):
+            st.dataframe(df_tampil, use_container_width=True, hide_index=True,
+                         column_config=tampil.config_rupiah())
     else:
         st.warning("⚠️ Tidak ada data sesuai filter.")
 
     # --- FITUR EXTRA 1: Visualisasi & Charts ---
+    # Semua grafik dari kubus rollup backend, dipotong top-N + "Lainnya" dan
+    # di-cache per versi data + filter (lihat kasva/grafik.py)
     if not df_filtered.empty:
         chart_col1, chart_col2 = st.columns(2)
         
         with chart_col1:
             st.subheader("📈 Grafik SPJ per Uraian")
-            df_spj = df_filtered[df_filtered["SPJ"].fillna(0) > 0]
-            if not df_spj.empty:
-                spj_uraian = df_spj.groupby("Uraian")["SPJ"].sum().reset_index().sort_values("Uraian")
-                bars = alt.Chart(spj_uraian).mark_bar(color="#FC5185").encode(
-                    x=alt.X("Uraian:N", sort=None, title="Uraian"),
-                    y=alt.Y("SPJ:Q", title="Total SPJ (Rp)"),
-                    tooltip=["Uraian", alt.Tooltip("SPJ", format=",")]
-                )
-                st.altair_chart(bars.properties(height=350), use_container_width=True)
-            else:
-                st.info("📭 Belum ada data SPJ > 0.")
+            with pantau.tahap("grafik"):
+                bars = grafik.spj_per_uraian(backend, f_tahun, f_kategori, f_kasir)
+                if bars is not None:
+                    st.altair_chart(bars, use_container_width=True)
+                else:
+                    st.info("📭 Belum ada data SPJ > 0.")
                 
         with chart_col2:
             st.subheader("🍕 Proporsi Realisasi per Kategori")
-            if total_spj > 0:
-                pie_data = df_filtered[df_filtered["SPJ"] > 0].groupby("Kategori")["SPJ"].sum().reset_index()
-                pie_chart = alt.Chart(pie_data).mark_arc(innerRadius=50).encode(
-                    color=alt.Color("Kategori:N", title="Kategori"),
-                    theta=alt.Theta("SPJ:Q"),
-                    tooltip=["Kategori", alt.Tooltip("SPJ", format=",")]
-                )
-                st.altair_chart(pie_chart.properties(height=350), use_container_width=True)
-            else:
-                st.info("📭 Belum ada pengeluaran SPJ untuk membuat diagram.")
+            with pantau.tahap("grafik"):
+                pie_chart = grafik.proporsi_kategori(backend, f_tahun, f_kategori, f_kasir) if total_spj > 0 else None
+                if pie_chart is not None:
+                    st.altair_chart(pie_chart, use_container_width=True)
+                else:
+                    st.info("📭 Belum ada pengeluaran SPJ untuk membuat diagram.")
 
         # Grafik Kategori UMK vs SPJ (Full Width di Bawah)
         st.subheader("📊 Perbandingan UMK & SPJ per Kategori")
-        grafik = df_filtered.groupby("Kategori")[["UMK", "SPJ"]].sum().reset_index().melt("Kategori", var_name="Jenis", value_name="Jumlah")
-        warna_custom = alt.Scale(domain=["UMK", "SPJ"], range=["#FC5185", "#3FC1C9"])
-        
-        bar_mix = alt.Chart(grafik).mark_bar().encode(
-            x=alt.X("Kategori:N", title="Kategori"),
-            y=alt.Y("Jumlah:Q", title="Jumlah (Rp)"),
-            color=alt.Color("Jenis:N", scale=warna_custom),
-            xOffset="Jenis:N"
-        )
-        st.altair_chart(bar_mix.properties(height=350), use_container_width=True)
+        with pantau.tahap("grafik"):
+            bar_mix = grafik.umk_spj_kategori(backend, f_tahun, f_kategori, f_kasir)
+            if bar_mix is not None:
+                st.altair_chart(bar_mix, use_container_width=True)
 
     # Export Section
     st.subheader("📥 Download / Export Data")
     if not df_filtered.empty:
-        csv = df_tampil.to_csv(index=False).encode("utf-8-sig")
-        st.download_button(
-            label="⬇️ Download Data Terfilter (.CSV)",
-            data=csv,
-            file_name=f"Kasva_Export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv",
-        )
+        # Export = seluruh hasil filter (bertipe); file baru dibuat saat tombol diklik
+        # dan di-cache per versi data + filter + format (lihat kasva/ekspor.py)
+        fmt = st.radio("Format", ekspor.FORMAT_TERSEDIA, horizontal=True)
+        ext, mime = ekspor.FORMAT[fmt]
+        with pantau.tahap("ekspor"):
+            st.download_button(
+                label=f"⬇️ Download Data Terfilter (.{ext.upper()})",
+                data=ekspor.pembuat(df_filtered, fmt, backend.data_version(),
+                                    (f_tahun, f_kategori, f_kasir)),
+                file_name=f"Kasva_Export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext}",
+                mime=mime,
+                on_click="ignore",
+            )
 
 # ========================
 # HALAMAN TENGGANG WAKTU
@@ -405,8 +373,8 @@ elif st.session_state["page"] == "tenggang":
     loader = st.empty()
     loader.markdown(loader_html, unsafe_allow_html=True)
 
-    data_tw = sheet_tw.get_all_records()
-    df_tw = pd.DataFrame(data_tw)
+    with pantau.tahap("muat_tenggat"):
+        df_tw = backend.load_deadlines()
     loader.empty()
 
     if not df_tw.empty:
@@ -420,41 +388,24 @@ elif st.session_state["page"] == "tenggang":
         search_query = st.text_input("🔍 Cari berdasarkan Nama Kasir / Uraian / Kategori:", "")
         if search_query:
             # Filter data berdasarkan text pencarian
-            df_tw = df_tw[df_tw.astype(str).apply(lambda x: x.str.contains(search_query, case=False)).any(axis=1)]
-
-        def warna_cell(sisa):
-            try: sisa = int(sisa)
-            except: return "#9d8c8c"
-            if sisa <= 5: return "#e74c3c"
-            elif 5 < sisa <= 10: return "#f1c40f"
-            elif 10 < sisa <= 21: return "#2ecc71"
-            else: return "#ffffff"
-
-        # HTML Table Generator
-        html = "<table style='width:100%; border-collapse: collapse;'>"
-        html += "<tr style='background-color:#4F46E5; color:white;'>"
-        for col in df_tw.columns:
-            html += f"<th style='padding:10px; border:1px solid #ddd; text-align:center;'>{col}</th>"
-        html += "</tr>"
-
-        for i, row in df_tw.iterrows():
-            html += "<tr>"
-            for col in df_tw.columns:
-                val = row[col]
-                if col == "Link" and pd.notna(val) and str(val).startswith("http"):
-                    val = f'<a href="{val}" target="_blank"><button style="background-color:#43C354; color:white; padding:4px 10px; border:none; border-radius:5px; cursor:pointer;"><img width="20" height="20" src="https://img.icons8.com/color/48/whatsapp--v1.png"/></button></a>'
-                elif col == "Sisa Hari":
-                    color = warna_cell(val)
-                    # Text disesuaikan agar kontras dengan warna background
-                    text_color = "white" if color in ["#e74c3c", "#2ecc71"] else "black"
-                    val = f"<div style='background-color:{color}; color:{text_color}; padding:6px; font-weight:bold; border-radius:4px; text-align:center;'>{val} Hari</div>"
-                elif col == "No":
-                    val = f"<div style='text-align:center;'>{val}</div>"
-
-                html += f"<td style='padding:8px; border:1px solid #ddd; text-align:center;'>{val}</td>"
-            html += "</tr>"
-        html += "</table>"
-        
-        st.markdown(html, unsafe_allow_html=True)
+            with pantau.tahap("cari"):
+                df_tw = df_tw[df_tw.astype(str).apply(lambda x: x.str.contains(search_query, case=False)).any(axis=1)]
+
+        with pantau.tahap("html"):
+            html = tampil.tabel_tenggat_html(df_tw)
+        with pantau.tahap("render_html"):
+            st.markdown(html, unsafe_allow_html=True)
     else:
-        st.info("⚠️ Tidak ada data tenggat waktu.")
\ No newline at end of file
+        st.info("⚠️ Tidak ada data tenggat waktu.")
+
+# ========================
+# PANTAU KINERJA (satu baris log JSON per rerun + panel debug untuk admin)
+# ========================
+hasil_pantau = pantau.selesai()
+if pantau.is_admin():
+    pantau.panel(hasil_pantau)
+    # Transaksi yang ditolak permanen oleh Spreadsheet tidak dikirim ulang otomatis
+    ditolak = backend.rejected_rows()
+    if not ditolak.empty:
+        with st.expander(f"🚫 {len(ditolak)} transaksi ditolak Spreadsheet (tidak dikirim ulang)"):
+            st.dataframe(ditolak, use_container_width=True, hide_index=True)
@@ -1,11 +1,14 @@
 import streamlit as st
 import pandas as pd
-import gspread, os, json
-from google.oauth2.service_account import Credentials
+import os, json
 from datetime import datetime
 from streamlit_extras.metric_cards import style_metric_cards
 import altair as alt
 
+from kasva import data as kasva_data
+from kasva import tampil
+from kasva.ledger import hitung_sisa_saldo
+
 # ------------------------
 # SETUP PAGE (harus paling atas)
 # ------------------------
@@ -15,30 +18,6 @@ st.set_page_config(page_title="Dashboard BKPSDM", layout="wide")
 if "page" not in st.session_state:
     st.session_state["page"] = "dashboard"  # default halaman
 
-# --- Auth ke Google Sheet Lokal ---
-scope = ["https://www.googleapis.com/auth/spreadsheets",
-         "https://www.googleapis.com/auth/drive"]
-creds = None
-try:
-    # --- Cloud (pakai Streamlit Secrets) ---
-    creds = Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"], scopes=scope
-    )
-except Exception:
-    # --- Lokal (pakai file json) ---
-    creds = Credentials.from_service_account_file(
-        r"C:/Users/MyBook Hype AMD/Videos/Dashboard Arus Kas/proven-mystery-471102-k6-0d7bdda0bcd4.json",
-        scopes=scope
-    )
-
-client = gspread.authorize(creds)
-# Gunakan st.secrets untuk menyimpan kredensial
-# scope = ["https://spreadsheets.google.com/feeds",
-#          "https://www.googleapis.com/auth/drive"]
-
-# creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=scope)
-# client = gspread.authorize(creds)
-
 # ------------------------
 # HALAMAN DASHBOARD
 # ------------------------
@@ -51,52 +30,36 @@ if st.session_state["page"] == "dashboard":
         st.rerun()
 
     # --- Load Data dari sheet Data ---
-    sheet = client.open("KASVA 1.0 - Aplikasi Cash Flow BKPSDM").worksheet("Data")
-    data = sheet.get_all_records()
-    df = pd.DataFrame(data)
-
-    # --- Bersihin Data ---
-    for col in ["UMK", "SPJ"]:
-        df[col] = (
-            df[col]
-            .astype(str)
-            .str.replace("Rp", "", regex=False)
-            .str.replace(".", "", regex=False)
-            .str.replace(",", "", regex=False)
-            .str.strip()
-            .replace("", "0")
-            .astype(float)
-        )
-
-    df["Tanggal"] = pd.to_datetime(df["Tanggal"], errors="coerce", dayfirst=True)
-    df = df.dropna(how="all")
+    # Ledger kompak dibagi semua sesi; filter cukup jadi array posisi baris
+    ledger = kasva_data.load_compact_ledger()
 
     # --- Filter ---
     st.subheader("🔍 Filter Data")
-    df["Tahun"] = df["Tanggal"].dt.year
-    df["Kategori"] = df["Kategori"].replace("", pd.NA)
-    df["Kasir"] = df["Kasir"].replace("", pd.NA)
+    gagal = kasva_data.load_tanggal_gagal()
+    if not gagal.empty:
+        with st.expander(f"⚠️ {len(gagal)} baris dilewati karena Tanggal tidak terbaca"):
+            st.dataframe(gagal, use_container_width=True, hide_index=True)
+    nominal_gagal = kasva_data.load_nominal_gagal()
+    if not nominal_gagal.empty:
+        with st.expander(f"⚠️ {len(nominal_gagal)} baris punya UMK/SPJ tidak terbaca (dihitung 0)"):
+            st.dataframe(nominal_gagal, use_container_width=True, hide_index=True)
 
     c1, c2 = st.columns(2)
     with c1:
-        tahun_list = sorted(df.loc[df["Tahun"].notna(), "Tahun"].astype(int).unique().tolist())
+        tahun_list = ledger.distinct("Tahun")
         tahun = st.selectbox("📅 Tahun", options=["Semua"] + tahun_list)
     with c2:
-        kategori_list = sorted(df["Kategori"].dropna().unique().tolist())
+        kategori_list = ledger.distinct("Kategori")
         kategori = st.selectbox("📂 Kategori", options=["Semua"] + kategori_list)
 
-    df_filtered = df.copy()
-    if tahun != "Semua":
-        df_filtered = df_filtered[df_filtered["Tahun"] == tahun]
-    if kategori != "Semua":
-        df_filtered = df_filtered[df_filtered["Kategori"] == kategori]
+    f_tahun = None if tahun == "Semua" else tahun
+    f_kategori = None if kategori == "Semua" else kategori
 
-    kasir_list = sorted(df_filtered["Kasir"].dropna().unique().tolist())
+    kasir_list = ledger.distinct("Kasir", f_tahun, f_kategori)
     kasir = st.selectbox("👤 Kasir", options=["Semua"] + kasir_list)
-    if kasir != "Semua":
-        df_filtered = df_filtered[df_filtered["Kasir"] == kasir]
+    f_kasir = None if kasir == "Semua" else kasir
 
-    df = df_filtered.copy()
+    df = ledger.frame(ledger.select(f_tahun, f_kategori, f_kasir))
 
     # Filter rentang tanggal
     if df["Tanggal"].notna().any():
@@ -121,13 +84,14 @@ if st.session_state["page"] == "dashboard":
     df = df[(df["Tanggal"] >= tgl_awal) & (df["Tanggal"] <= tgl_akhir)]
 
     # --- Hitung Sisa Saldo ---
+    # Mulai dari saldo sebelum tgl_awal (bukan 0) supaya rentang tanggal tetap akurat
+    saldo_awal = kasva_data.load_balance_index().saldo_awal(
+        tgl_awal,
+        kategori=f_kategori,
+        kasir=f_kasir,
+    )
     df = df.sort_values("Tanggal").reset_index(drop=True)
-    sisa = []
-    saldo = 0
-    for _, row in df.iterrows():
-        saldo = saldo - row["SPJ"] + row["UMK"]
-        sisa.append(saldo)
-    df["Sisa Saldo"] = sisa
+    df["Sisa Saldo"] = saldo_awal + hitung_sisa_saldo(df)
 
   # fungsi helper rupiah
     def format_rupiah(x):
@@ -174,21 +138,16 @@ if st.session_state["page"] == "dashboard":
     # --- Data Table ---
     st.subheader("📋 Data Detail")
     if not df.empty:
-        df_tampil = df.copy()
-        df_tampil["Tanggal"] = df_tampil["Tanggal"].dt.strftime("%d-%m-%Y")
-
         cols = ["Tanggal", "Kategori", "Kasir", "Uraian", "UMK", "SPJ"]
         if kategori != "Semua" or kasir != "Semua":
             cols.append("Sisa Saldo")
-        df_tampil = df_tampil[cols]
 
-        for col in ["UMK", "SPJ", "Sisa Saldo"]:
-            if col in df_tampil.columns:
-                df_tampil[col] = df_tampil[col].apply(
-                    lambda x: f"Rp{int(x):,}".replace(",", ".")
-                )
+        # Sort/halaman di server: hanya baris halaman aktif yang dikirim ke browser
+        df_tampil = tampil.halaman(df[cols], key="detail", kolom_sort=cols)
+        df_tampil["Tanggal"] = df_tampil["Tanggal"].dt.strftime("%d-%m-%Y")
 
-        st.dataframe(df_tampil, use_container_width=True)
+        # Rupiah tetap angka; format ribuan di browser (kasva.tampil)
+        st.dataframe(df_tampil, use_container_width=True, column_config=tampil.config_rupiah())
     else:
         st.warning("⚠️ Tidak ada data sesuai filter.")
 
@@ -307,9 +266,7 @@ elif st.session_state["page"] == "tenggang":
     loader.markdown(loader_html, unsafe_allow_html=True)
 
     # --- Load Data dari sheet Tenggang Waktu ---
-    sheet_tw = client.open("KASVA 1.0 - Aplikasi Cash Flow BKPSDM").worksheet("Tenggat Waktu")
-    data_tw = sheet_tw.get_all_records()
-    df_tw = pd.DataFrame(data_tw)
+    df_tw = kasva_data.load_tenggat()
 
     # Hapus loader setelah data siap
     loader.empty()
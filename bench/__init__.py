@@ -0,0 +1 @@
+# Benchmark KASVA, jalankan dari root repo: python -m bench.<nama>
@@ -0,0 +1,218 @@
+"""Benchmark pipeline ledger per tahap, atas ledger sintetis dan Google Sheets palsu (offline).
+
+    python -m bench.bench_ledger [--sizes 1000 10000 100000 1000000]
+    python -m bench.bench_ledger --simpan bench/hasil.json
+    python -m bench.bench_ledger --banding bench/hasil.json    # exit 1 kalau ada yang melambat
+
+Tahap yang diukur (ms, terbaik dari --ulang kali):
+  ambil       batchGet sheet Data dari spreadsheet palsu (termasuk encode/decode JSON)
+  transpose   grid → kolom mentah (grid_columns)
+  bersih      parse Rupiah/Tanggal/category (columns_to_ledger)
+  sinkron     sinkron inkremental 20 baris baru (LedgerSync: ekor + checksum + parse)
+  kompak      CompactLedger (indeks filter + kubus rollup)
+  saldo       Sisa Saldo seluruh ledger + BalanceIndex
+  tenggat     pelunasan FIFO UMK/SPJ (hitung_tenggat)
+  filter      select + frame untuk beberapa kombinasi filter (rata-rata)
+  agregasi    totals + rollup Bulan/Kategori/Uraian + top-N grafik
+  halaman     sort + potong 50 baris + format + payload Arrow yang dikirim ke browser
+  arrow_penuh payload Arrow seluruh hasil filter (pembanding tabel tanpa halaman)
+  html        tabel HTML Tenggat Waktu (n/10 baris, maks --maks-tenggat)
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+from bench.sintetis import FakeSpreadsheet, buat_grid, buat_grid_tenggat, pasang
+from kasva import grafik, sheets, tampil
+from kasva.data import columns_to_ledger, grid_columns, grid_to_ledger
+from kasva.ledger import BalanceIndex, CompactLedger, hitung_sisa_saldo
+from kasva.sync import LedgerSync
+from kasva.tenggat import hitung_tenggat
+
+TAHAP = ("ambil", "transpose", "bersih", "sinkron", "kompak", "saldo", "tenggat",
+         "filter", "agregasi", "halaman", "arrow_penuh", "html")
+
+# Di bawah ini selisih waktu dianggap noise saat --banding
+MIN_MS = 1.0
+
+
+def ukur(fungsi, ulang=3):
+    terbaik = float("inf")
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik * 1000
+
+
+def _filter_contoh(ledger):
+    # Kombinasi filter khas dashboard: semua, per tahun, per tahun+kategori, +kasir
+    # (tahun = tahun dengan transaksi terbanyak)
+    per_tahun = ledger.rollup("Tahun")
+    tahun = int(per_tahun["Tahun"].iloc[per_tahun["Transaksi"].argmax()])
+    kat = ledger.distinct("Kategori", tahun)[0]
+    ksr = ledger.distinct("Kasir", tahun, kat)[0]
+    return [(None, None, None), (tahun, None, None), (tahun, kat, None), (tahun, kat, ksr)]
+
+
+def jalankan(n, ulang, maks_tenggat, seed=0):
+    """Ukur semua tahap untuk ledger ``n`` baris. Return (dict tahap → ms, info)."""
+    grid = buat_grid(n, seed)
+    fake = pasang(FakeSpreadsheet({
+        "Data": grid,
+        "Tenggat Waktu": buat_grid_tenggat(min(max(n // 10, 1), maks_tenggat), seed),
+    }))
+    hasil = {}
+
+    hasil["ambil"] = ukur(lambda: sheets.batch_values(["'Data'!A:H"]), ulang)
+    fake.panggilan = fake.byte = 0
+    (grid_api,) = sheets.batch_values(["'Data'!A:H"])
+    byte_ambil = fake.byte
+
+    hasil["transpose"] = ukur(lambda: grid_columns(grid_api), ulang)
+    header, kolom = grid_columns(grid_api)
+    hasil["bersih"] = ukur(lambda: columns_to_ledger(header, kolom), ulang)
+    df = columns_to_ledger(header, kolom)
+
+    sync = LedgerSync("Data", parse=grid_to_ledger)
+    sync.apply(sheets.batch_values([sync.next_range()])[0])
+    baru = [r[1:] for r in grid[1:21]]
+
+    def sinkron():
+        sheets.worksheet("Data").append_rows(baru)
+        assert sync.apply(sheets.batch_values([sync.next_range()])[0])
+    hasil["sinkron"] = ukur(sinkron, ulang)
+
+    df = df[df["Tanggal"].notna()]
+    hasil["kompak"] = ukur(lambda: CompactLedger(df), ulang)
+    ledger = CompactLedger(df)
+
+    def saldo():
+        hitung_sisa_saldo(df)
+        BalanceIndex(df)
+    hasil["saldo"] = ukur(saldo, ulang)
+    hasil["tenggat"] = ukur(lambda: hitung_tenggat(df), ulang)
+
+    filter_ = _filter_contoh(ledger)
+    hasil["filter"] = ukur(
+        lambda: [ledger.frame(ledger.select(*f)) for f in filter_], ulang) / len(filter_)
+
+    def agregasi():
+        ledger.totals()
+        ledger.rollup(["Bulan"], filter_[1][0])
+        grafik.top_n(ledger.rollup(["Kategori"]), "Kategori", "SPJ", grafik.TOP_N)
+        grafik.top_n(ledger.rollup(["Uraian"]), "Uraian", "SPJ", grafik.TOP_N)
+    hasil["agregasi"] = ukur(agregasi, ulang)
+
+    # Tabel Data Detail di dashboard: hasil filter per tahun + Sisa Saldo
+    detail = ledger.frame(ledger.select(filter_[1][0]))
+    detail["Sisa Saldo"] = hitung_sisa_saldo(detail)
+    cols = ["Tanggal", "Kategori", "Kasir", "Uraian", "UMK", "SPJ", "Sisa Saldo"]
+
+    def halaman():
+        hal = detail[cols].sort_values("UMK", ascending=False, kind="stable").iloc[:50].copy()
+        hal["Tanggal"] = hal["Tanggal"].dt.strftime("%d/%m/%Y")
+        return convert_pandas_df_to_arrow_bytes(tampil.kosongkan_nol(hal))
+    hasil["halaman"] = ukur(halaman, ulang)
+    hasil["arrow_penuh"] = ukur(lambda: convert_pandas_df_to_arrow_bytes(detail[cols]), ulang)
+
+    df_tw = pd.DataFrame(fake.sheets["Tenggat Waktu"][1:], columns=fake.sheets["Tenggat Waktu"][0])
+    df_tw = df_tw.drop(columns=["SPJ", "Keterangan"])
+    hasil["html"] = ukur(lambda: tampil.tabel_tenggat_html(df_tw), ulang)
+
+    info = {
+        "baris_detail": len(detail),
+        "baris_tenggat": len(df_tw),
+        "kb_ambil": round(byte_ambil / 1024),
+        "kb_ledger": round(ledger.frame().memory_usage(deep=True).sum() / 1024),
+        "kb_arrow_halaman": round(len(halaman()) / 1024, 1),
+        "kb_arrow_penuh": round(len(convert_pandas_df_to_arrow_bytes(detail[cols])) / 1024),
+        "kb_html": round(len(tampil.tabel_tenggat_html(df_tw)) / 1024),
+    }
+    return hasil, info
+
+
+def cetak(laporan):
+    sizes = list(laporan["hasil"])
+    print(f"{'tahap (ms)':<12}" + "".join(f"{s:>12}" for s in sizes))
+    for t in TAHAP:
+        print(f"{t:<12}" + "".join(f"{laporan['hasil'][s][t]:>12.1f}" for s in sizes))
+    print()
+    for k in laporan["info"][sizes[0]]:
+        print(f"{k:<17}" + "".join(f"{laporan['info'][s][k]:>12}" for s in sizes))
+
+
+def banding(laporan, dasar, toleransi):
+    """Cetak rasio baru/dasar per tahap; return True kalau ada tahap yang melambat."""
+    melambat = False
+    sizes = [s for s in laporan["hasil"] if s in dasar["hasil"]]
+    if not sizes:
+        print("\nTidak ada ukuran yang sama dengan laporan dasar.")
+        return False
+    print(f"\nbanding dengan {dasar['meta'].get('waktu', '?')} (rasio baru/dasar, ▲ > {1 + toleransi:.2f}x)")
+    print(f"{'tahap':<12}" + "".join(f"{s:>12}" for s in sizes))
+    for t in TAHAP:
+        sel = []
+        for s in sizes:
+            baru, lama = laporan["hasil"][s][t], dasar["hasil"][s].get(t)
+            if lama is None:
+                sel.append(f"{'-':>12}")
+                continue
+            rasio = baru / lama if lama else float("inf")
+            tanda = " "
+            if rasio > 1 + toleransi and baru - lama > MIN_MS:
+                tanda, melambat = "▲", True
+            sel.append(f"{rasio:>10.2f}x{tanda}")
+        print(f"{t:<12}" + "".join(sel))
+    return melambat
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    ap.add_argument("--ulang", type=int, default=3, help="ulangan per tahap (diambil yang tercepat)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--maks-tenggat", type=int, default=5_000, help="batas baris tabel HTML Tenggat")
+    ap.add_argument("--simpan", metavar="JSON", help="tulis laporan ke file JSON")
+    ap.add_argument("--banding", metavar="JSON", help="bandingkan dengan laporan JSON sebelumnya")
+    ap.add_argument("--toleransi", type=float, default=0.25, help="batas melambat untuk --banding")
+    args = ap.parse_args()
+
+    laporan = {
+        "meta": {
+            "waktu": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "mesin": platform.platform(),
+            "seed": args.seed,
+            "ulang": args.ulang,
+        },
+        "hasil": {},
+        "info": {},
+    }
+    for n in args.sizes:
+        hasil, info = jalankan(n, args.ulang, args.maks_tenggat, args.seed)
+        laporan["hasil"][str(n)] = {t: round(hasil[t], 3) for t in TAHAP}
+        laporan["info"][str(n)] = info
+    cetak(laporan)
+
+    if args.simpan:
+        with open(args.simpan, "w", encoding="utf-8") as f:
+            json.dump(laporan, f, indent=2)
+        print(f"\nLaporan disimpan di {args.simpan}")
+    if args.banding:
+        with open(args.banding, encoding="utf-8") as f:
+            dasar = json.load(f)
+        if banding(laporan, dasar, args.toleransi):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Micro-benchmark parser sheet: Rupiah (parse_rupiah) dan Tanggal (parse_tanggal) vs versi lama.
+
+    python -m bench.bench_parse [--sizes 10000 100000 1000000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from kasva.parse import parse_rupiah, parse_tanggal
+
+
+def clean_lama(s):
+    # Pembersih Rupiah di aruskasv2.py / aruskasv3.py sebelum kasva.parse (commit 78f4a85):
+    # rantai str.replace, titik dan koma sama-sama dibuang
+    return (
+        s.astype(str)
+        .str.replace("Rp", "", regex=False)
+        .str.replace(".", "", regex=False)
+        .str.replace(",", "", regex=False)
+        .str.strip()
+        .replace("", "0")
+        .astype(float)
+    )
+
+
+def tanggal_lama(s):
+    # Parser tanggal sebelum kasva.parse.parse_tanggal (kasva.data.clean_data, dihapus di
+    # commit 83ec8b6): satu pd.to_datetime dayfirst, format ditebak ulang per sel
+    return pd.to_datetime(s, errors="coerce", dayfirst=True, format="mixed")
+
+
+def kolom_teks(n, rng):
+    nilai = rng.integers(0, 50_000, n) * 1000
+    teks = pd.Series([f"Rp{v:,}".replace(",", ".") for v in nilai], dtype=object)
+    teks[rng.random(n) < 0.5] = ""    # separuh baris kosong (UMK atau SPJ saja)
+    return teks
+
+
+def kolom_tanggal(n, rng):
+    # ~5 tahun tanggal, campuran format tambah_data (%d-%m-%Y) dan form_tambah (%d/%m/%Y)
+    tgl = pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 1826, n), unit="D")
+    return pd.Series(
+        np.where(rng.random(n) < 0.5, tgl.strftime("%d-%m-%Y"), tgl.strftime("%d/%m/%Y")),
+        dtype=object,
+    )
+
+
+def ukur(fungsi, s, ulang=3):
+    terbaik = float("inf")
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi(s)
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'baris':>10} {'lama (ms)':>12} {'teks (ms)':>12} {'angka (ms)':>12}")
+    for n in args.sizes:
+        teks = kolom_teks(n, rng)
+        angka = pd.Series(rng.integers(0, 50_000, n) * 1000)
+        assert (parse_rupiah(teks) == clean_lama(teks).astype("int64")).all()
+        print(f"{n:>10} {ukur(clean_lama, teks):>12.1f} "
+              f"{ukur(parse_rupiah, teks):>12.1f} {ukur(parse_rupiah, angka):>12.1f}")
+
+    print(f"\n{'baris':>10} {'tgl lama (ms)':>14} {'tgl baru (ms)':>14}")
+    for n in args.sizes:
+        tgl = kolom_tanggal(n, rng)
+        assert (parse_tanggal(tgl) == tanggal_lama(tgl)).all()
+        print(f"{n:>10} {ukur(tanggal_lama, tgl):>14.1f} {ukur(parse_tanggal, tgl):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
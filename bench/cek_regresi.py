@@ -0,0 +1,259 @@
+"""Cek regresi offline (Google Sheets palsu + SQLite sementara) untuk kasus yang pernah salah.
+
+    python -m bench.cek_regresi
+"""
+import os
+import tempfile
+import time
+from contextlib import closing
+
+# Mirror, antrian, dan database ke folder sementara (harus sebelum import kasva)
+_TMP = tempfile.mkdtemp(prefix="kasva_cek_")
+os.environ["KASVA_MIRROR_DIR"] = os.path.join(_TMP, "mirror")
+os.environ["KASVA_QUEUE"] = os.path.join(_TMP, "antrian.db")
+
+import pandas as pd  # noqa: E402
+import requests  # noqa: E402
+from gspread.exceptions import APIError  # noqa: E402
+
+from bench.sintetis import HEADER, FakeSpreadsheet, pasang  # noqa: E402
+from kasva import data as kasva_data  # noqa: E402
+from kasva import sheets  # noqa: E402
+from kasva import storage  # noqa: E402
+from kasva.parse import parse_rupiah  # noqa: E402
+
+
+def _spreadsheet(rows):
+    grid = [list(HEADER)] + [[str(i)] + r for i, r in enumerate(rows, 1)]
+    return pasang(FakeSpreadsheet({
+        "Data": grid,
+        "Data Kasir": [["Nama"], ["Ani"]],
+        "Tenggat Waktu": [["No", "Kasir", "Sisa Hari"]],
+    }))
+
+
+def _backends(rows):
+    """GoogleSheetsBackend (sheet palsu) dan SQLiteBackend berisi ``rows`` yang sama."""
+    _spreadsheet(rows)
+    kasva_data.invalidate()
+    gs = storage.GoogleSheetsBackend()
+    lite = storage.SQLiteBackend(os.path.join(_TMP, f"kasva_{len(rows)}.db"))
+    lite.import_frames(kasva_data.load_data(), ["Ani"])
+    return {"gsheets": gs, "sqlite": lite}
+
+
+def cek_tenggat_lintas_tahun():
+    # SPJ Januari 2025 melunasi UMK Desember 2024; UMK 10-01-2025 tetap terbuka
+    rows = [
+        ["20-12-2024", "UMPEG", "Ani", "UMK Desember", "Rp1.000.000", "", ""],
+        ["05-01-2025", "UMPEG", "Ani", "SPJ Desember", "", "Rp1.000.000", ""],
+        ["10-01-2025", "UMPEG", "Ani", "UMK Januari", "Rp500.000", "", ""],
+    ]
+    for nama, backend in _backends(rows).items():
+        df = backend.load_ledger_tenggat(2025)
+        umk = df[df["UMK"] > 0].iloc[0]
+        assert umk["Sisa UMK"] == 500_000, (nama, umk.to_dict())
+        assert umk["Tenggat Waktu"] == pd.Timestamp("2025-01-31"), (nama, umk.to_dict())
+        spj = df[df["SPJ"] > 0].iloc[0]
+        assert pd.isna(spj["Sisa UMK"]), (nama, spj.to_dict())
+
+
+def cek_status_ikut_ledger():
+    # Entri cache ledger kedaluwarsa sendiri lalu dibangun ulang dari sheet yang lebih
+    # baru: status pelunasan harus ikut objek ledger yang sama, tidak boleh tertinggal
+    rows = [["02-01-2025", "UMPEG", "Ani", "UMK", "Rp100.000", "", ""]]
+    fake = _spreadsheet(rows)
+    kasva_data.invalidate()
+    backend = storage.GoogleSheetsBackend()
+    assert len(backend.load_ledger_tenggat(2025)) == 1
+    fake.worksheet("Data").append_rows([["03-01-2025", "UMPEG", "Ani", "UMK 2", "Rp50.000", "", ""]])
+    kasva_data._load_bundle.clear()
+    kasva_data._load_compact_ledger.clear()
+    df = backend.load_ledger_tenggat(2025)
+    assert df["Sisa UMK"].tolist() == [100_000, 50_000], df
+
+
+def cek_saldo_awal_tahun():
+    # Sisa Saldo tampilan per tahun harus lanjut dari saldo akhir tahun sebelumnya
+    rows = [
+        ["20-12-2024", "UMPEG", "Ani", "UMK Desember", "Rp1.000.000", "", ""],
+        ["21-12-2024", "PIP", "Ani", "UMK PIP", "Rp300.000", "", ""],
+        ["05-01-2025", "UMPEG", "Ani", "SPJ Desember", "", "Rp400.000", ""],
+    ]
+    for nama, backend in _backends(rows).items():
+        assert backend.opening_balance("2025-01-01") == 1_300_000, nama
+        assert backend.opening_balance("2025-01-01", "UMPEG", "Ani") == 1_000_000, nama
+        assert backend.opening_balance("2024-12-21", "PIP") == 0, nama
+
+
+def cek_snapshot_setelah_sinkron_gagal():
+    # Restart dengan mirror lokal, sinkron background gagal, sheet lalu bertambah:
+    # setelah invalidate data harus ikut sheet, bukan snapshot mirror selamanya
+    rows = [["02-01-2025", "UMPEG", "Ani", f"UMK {i}", "Rp100.000", "", ""] for i in range(3)]
+    fake = _spreadsheet(rows)
+    kasva_data.invalidate()
+    assert len(kasva_data.load_data()) == 3          # mirror lokal tersimpan
+
+    # "Restart" proses: state + sinkron dari nol, Sheets API sedang gagal
+    kasva_data._state.clear()
+    kasva_data._ledger_sync.clear()
+    kasva_data.invalidate()
+    asli = fake.values_batch_get
+
+    def gagal(*args, **kwargs):
+        raise ConnectionError("sheets down")
+    fake.values_batch_get = gagal
+    assert len(kasva_data.load_data()) == 3          # snapshot selama sinkron jalan
+    state = kasva_data._state()
+    for _ in range(100):
+        if not state["menyegarkan"]:
+            break
+        time.sleep(0.05)
+    assert not state["menyegarkan"]
+
+    fake.values_batch_get = asli
+    fake.worksheet("Data").append_rows([["03-01-2025", "UMPEG", "Ani", "UMK baru", "Rp50.000", "", ""]])
+    kasva_data.invalidate()
+    assert len(kasva_data.load_data()) == 4
+    assert state["snapshot"] is None
+
+
+def cek_antrian_ditolak_permanen():
+    # 400 karena satu baris: baris itu pindah ke tabel gagal, baris lain tetap terkirim
+    fake = _spreadsheet([["02-01-2025", "UMPEG", "Ani", "UMK", "Rp100.000", "", ""]])
+    kasva_data.invalidate()
+    backend = storage.GoogleSheetsBackend()
+    antrian = backend.antrian
+    ws = fake.worksheet("Data")
+    asli = type(ws).append_rows
+
+    def tolak_rusak(self, values, table_range=None, **kwargs):
+        if any(r[3] == "RUSAK" for r in values):
+            raise _api_error(400)
+        return asli(self, values, table_range)
+    type(ws).append_rows = tolak_rusak
+    try:
+        with antrian._lock:
+            for uraian in ("SPJ 1", "RUSAK", "SPJ 2"):
+                backend.submit_transaction(pd.Timestamp("2025-01-03"), "UMPEG", "Ani", uraian, 0, 1_000)
+        antrian.coba_lagi = 0
+        antrian.flush()
+    finally:
+        type(ws).append_rows = asli
+    assert antrian.depth() == 0, antrian.pending()
+    assert [r[4] for r in fake.sheets["Data"][2:]] == ["SPJ 1", "SPJ 2"], fake.sheets["Data"]
+    ditolak = backend.rejected_rows()
+    assert ditolak["Uraian"].tolist() == ["RUSAK"] and "400" in ditolak["Error"].iloc[0], ditolak
+    assert fake.sheets["Data"][0][8] == storage.HEADER_KUNCI
+
+    # Kolom kunci sudah dipakai untuk hal lain → tidak ditulis, baris tetap di jurnal
+    fake = _spreadsheet([["02-01-2025", "UMPEG", "Ani", "UMK", "Rp100.000", "", ""]])
+    fake.sheets["Data"][0].append("Catatan")
+    backend = storage.GoogleSheetsBackend()
+    backend.submit_transaction(pd.Timestamp("2025-01-03"), "UMPEG", "Ani", "SPJ", 0, 1_000)
+    backend.antrian.coba_lagi = 0
+    backend.antrian.flush()
+    assert len(fake.sheets["Data"]) == 2, fake.sheets["Data"]
+    assert "Kolom I" in backend.antrian.error_terakhir, backend.antrian.error_terakhir
+    assert backend.antrian.depth() == 1
+    # Jurnal dipakai bersama cek lain → kosongkan lagi
+    with closing(backend.antrian._connect()) as con, con:
+        con.execute("DELETE FROM pending")
+
+
+def cek_nominal_tidak_terbaca():
+    # Koma + tiga digit = pemisah ribuan; sel yang tetap tidak terbaca dilaporkan
+    rows = [
+        ["02-01-2025", "UMPEG", "Ani", "UMK koma", "Rp1,250,000", "", ""],
+        ["03-01-2025", "UMPEG", "Ani", "SPJ desimal", "", "Rp1.250.000,75", ""],
+        ["04-01-2025", "UMPEG", "Ani", "SPJ rusak", "", "seratus ribu", ""],
+    ]
+    _spreadsheet(rows)
+    kasva_data.invalidate()
+    df = kasva_data.load_data()
+    assert df["UMK"].tolist() == [1_250_000, 0, 0], df["UMK"].tolist()
+    assert df["SPJ"].tolist() == [0, 1_250_001, 0], df["SPJ"].tolist()
+    gagal = kasva_data.load_nominal_gagal()
+    assert gagal["Uraian"].tolist() == ["SPJ rusak"], gagal
+    assert kasva_data.KOLOM_NOMINAL_GAGAL not in kasva_data.load_tanggal_gagal().columns
+
+    # x,5 dibulatkan ke atas (bukan ke genap), juga untuk sel angka dan nilai negatif
+    teks = pd.Series(["1.500,5", "2,5", "Rp3,5", "-2,5", "1.501,5"], dtype=object)
+    assert parse_rupiah(teks).tolist() == [1_501, 3, 4, -3, 1_502], parse_rupiah(teks).tolist()
+    assert parse_rupiah(pd.Series([0.5, 2.5, 1.4])).tolist() == [1, 3, 1]
+
+
+def cek_versi_sqlite():
+    # Import ulang dengan jumlah baris sama tetap harus mengganti versi data
+    rows = [["02-01-2025", "UMPEG", "Ani", "UMK", "Rp100.000", "", ""]]
+    lite = _backends(rows)["sqlite"]
+    versi = lite.data_version()
+    ubah = kasva_data.load_data().assign(UMK=200_000)
+    lite.import_frames(ubah, ["Ani"])
+    assert lite.data_version() != versi
+    versi = lite.data_version()
+    lite.append_transaction(pd.Timestamp("2025-01-03"), "UMPEG", "Ani", "SPJ", 0, 50_000)
+    assert lite.data_version() != versi
+
+
+def _api_error(kode):
+    resp = requests.Response()
+    resp.status_code = kode
+    resp._content = b'{"error": {"code": %d, "message": "x", "status": "x"}}' % kode
+    return APIError(resp)
+
+
+def cek_antrian_tidak_dobel():
+    # Append diterapkan di server tapi respons timeout/5xx: kirim ulang tidak boleh
+    # menulis baris yang sama dua kali
+    assert sheets.ditolak(_api_error(429)) and not sheets.ditolak(_api_error(503))
+    fake = _spreadsheet([["02-01-2025", "UMPEG", "Ani", "UMK", "Rp100.000", "", ""]])
+    kasva_data.invalidate()
+    backend = storage.GoogleSheetsBackend()
+    antrian = backend.antrian
+    ws = fake.worksheet("Data")
+    asli = type(ws).append_rows
+
+    def timeout_setelah_tulis(self, values, table_range=None, **kwargs):
+        asli(self, values, table_range)
+        raise _api_error(503)
+    type(ws).append_rows = timeout_setelah_tulis
+    try:
+        with antrian._lock:      # worker tidak ikut mengirim sebelum append dipasang ulang
+            backend.submit_transaction(pd.Timestamp("2025-01-03"), "UMPEG", "Ani", "SPJ", 0, 50_000)
+            backend.submit_transaction(pd.Timestamp("2025-01-04"), "UMPEG", "Ani", "SPJ", 0, 20_000)
+        antrian.flush()
+    finally:
+        type(ws).append_rows = asli
+    assert antrian.depth() == 2 and len(fake.sheets["Data"]) == 4
+    antrian.coba_lagi = 0
+    antrian.flush()
+    assert antrian.depth() == 0 and len(fake.sheets["Data"]) == 4, fake.sheets["Data"]
+
+    # 429: pasti belum tertulis → dikirim ulang tanpa cek kolom kunci
+    def kuota_habis(self, values, table_range=None, **kwargs):
+        raise _api_error(429)
+    type(ws).append_rows = kuota_habis
+    try:
+        backend.submit_transaction(pd.Timestamp("2025-01-05"), "UMPEG", "Ani", "SPJ", 0, 10_000)
+        antrian.coba_lagi = 0
+        antrian.flush()
+    finally:
+        type(ws).append_rows = asli
+    antrian.coba_lagi = 0
+    antrian.flush()
+    assert antrian.depth() == 0 and len(fake.sheets["Data"]) == 5, fake.sheets["Data"]
+
+
+CEK = [cek_tenggat_lintas_tahun, cek_status_ikut_ledger, cek_saldo_awal_tahun, cek_snapshot_setelah_sinkron_gagal,
+       cek_antrian_tidak_dobel, cek_antrian_ditolak_permanen, cek_nominal_tidak_terbaca, cek_versi_sqlite]
+
+
+def main():
+    for cek in CEK:
+        cek()
+        print(f"ok  {cek.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Ledger sintetis + Google Sheets palsu (offline) untuk benchmark.
+
+Pola baris meniru sheet Data: tiap UMK (uang muka) diikuti beberapa SPJ
+dalam ~30 hari yang melunasinya (sebagian lunas penuh, sebagian belum),
+dicatat kurang lebih urut tanggal seperti hasil append tambah_data.
+Sel ditulis seperti render FORMATTED_VALUE API: "Rp1.250.000", tanggal
+"%d-%m-%Y" (tambah_data) atau "%d/%m/%Y" (form_tambah).
+"""
+import json
+import re
+
+import numpy as np
+import pandas as pd
+from gspread.utils import a1_to_rowcol, to_records
+
+HEADER = ["No", "Tanggal", "Kategori", "Kasir", "Uraian", "UMK", "SPJ", "Keterangan"]
+HEADER_TENGGAT = ["No", "Tanggal", "Kategori", "Kasir", "Uraian", "UMK", "SPJ",
+                  "Keterangan", "Tenggat Waktu", "Sisa Hari", "Link"]
+
+KATEGORI = ["UMPEG", "RENVAL", "PIP", "SPPD", "MP", "BANGKOM"]
+KASIR = ["Ani", "Budi", "Citra", "Dedi", "Eka", "Fajar", "Gita", "Hadi",
+         "Indah", "Joko", "Kurnia", "Lestari"]
+BELANJA = ["Belanja ATK", "Konsumsi Rapat", "Perjalanan Dinas", "Honorarium Narasumber",
+           "Cetak dan Fotokopi", "BBM Kendaraan Dinas", "Pemeliharaan Kendaraan",
+           "Sewa Gedung", "Belanja Modal Komputer", "Jasa Kebersihan", "Langganan Internet",
+           "Materai dan Perangko", "Belanja Bahan Seminar", "Uang Harian Diklat",
+           "Transport Lokal"]
+
+# Porsi UMK yang akhirnya di-SPJ-kan: lunas penuh / sebagian / belum sama sekali
+PELUNASAN = (0.80, 0.15, 0.05)
+
+
+def _rupiah(nilai):
+    # Format tiap nominal unik sekali saja (nominal bulat banyak berulang)
+    kode, unik = pd.factorize(nilai)
+    teks = np.array([f"Rp{v:,}".replace(",", ".") if v else "" for v in unik], dtype=object)
+    return teks[kode]
+
+
+def _tanggal(tgl, rng):
+    kode, unik = pd.factorize(tgl)
+    unik = pd.DatetimeIndex(unik)
+    fmt = np.where(rng.random(len(tgl)) < 0.7,
+                   unik.strftime("%d-%m-%Y").to_numpy(dtype=object)[kode],
+                   unik.strftime("%d/%m/%Y").to_numpy(dtype=object)[kode])
+    return fmt
+
+
+def buat_ledger(n, seed=0, awal="2021-01-01", tahun=6):
+    """DataFrame bertipe (Tanggal, Kategori, Kasir, Uraian, UMK, SPJ, Keterangan), ``n`` baris."""
+    rng = np.random.default_rng(seed)
+    # Jumlah SPJ per UMK (0 untuk UMK yang belum di-SPJ-kan)
+    n_umk = n // 4 + 1
+    status = rng.choice(3, n_umk, p=PELUNASAN)
+    jml_spj = np.where(status == 2, 0, rng.integers(1, 7, n_umk))
+    blok = np.cumsum(1 + jml_spj)
+    n_umk = int(np.searchsorted(blok, n)) + 1
+    status, jml_spj = status[:n_umk], jml_spj[:n_umk]
+
+    hari = int(365.25 * tahun)
+    tgl_umk = pd.Timestamp(awal) + pd.to_timedelta(rng.integers(0, hari, n_umk), unit="D")
+    umk = rng.integers(5, 200, n_umk) * 100_000
+    kat = rng.integers(0, len(KATEGORI), n_umk)
+    ksr = rng.integers(0, len(KASIR), n_umk)
+
+    # Baris SPJ: nominal = bagian acak dari UMK induknya, dibulatkan ke ribuan
+    induk = np.repeat(np.arange(n_umk), jml_spj)
+    bobot = rng.exponential(1.0, induk.size)
+    porsi = bobot / np.bincount(induk, bobot, minlength=n_umk)[induk]
+    rasio = np.where(status == 0, 1.0, rng.uniform(0.5, 0.95, n_umk))[induk]
+    spj = (umk[induk] * rasio * porsi // 1000 * 1000).astype("int64")
+    # SPJ terakhir UMK yang lunas penuh menutup sisa pembulatan
+    terakhir = np.r_[induk[1:] != induk[:-1], True] if induk.size else induk.astype(bool)
+    kurang = umk - np.bincount(induk, spj, minlength=n_umk).astype("int64")
+    lunas = terakhir & (status[induk] == 0)
+    spj[lunas] += kurang[induk[lunas]]
+    tgl_spj = tgl_umk[induk] + pd.to_timedelta(rng.integers(0, 31, induk.size), unit="D")
+
+    uraian_spj = [f"{BELANJA[b]} {k}" for b, k in
+                  zip(rng.integers(0, len(BELANJA), induk.size), rng.integers(1, 21, induk.size))]
+    df = pd.DataFrame({
+        "Tanggal": np.r_[tgl_umk.to_numpy(), tgl_spj.to_numpy()],
+        "Kategori": np.r_[kat, kat[induk]],
+        "Kasir": np.r_[ksr, ksr[induk]],
+        "Uraian": [f"UMK {KATEGORI[k]}" for k in kat] + uraian_spj,
+        "UMK": np.r_[umk, np.zeros(induk.size, dtype="int64")],
+        "SPJ": np.r_[np.zeros(n_umk, dtype="int64"), spj],
+    })
+    df["Kategori"] = pd.Categorical.from_codes(df["Kategori"], KATEGORI)
+    df["Kasir"] = pd.Categorical.from_codes(df["Kasir"], KASIR)
+    df["Keterangan"] = np.where(rng.random(len(df)) < 0.1, "Nota lengkap", "")
+    # Urutan catat ≈ urutan tanggal (UMK sebelum SPJ di hari yang sama)
+    return df.sort_values("Tanggal", kind="stable").head(n).reset_index(drop=True)
+
+
+def buat_grid(n, seed=0, **kw):
+    """Grid mentah sheet Data (header + ``n`` baris) seperti hasil values.get."""
+    df = buat_ledger(n, seed, **kw)
+    rng = np.random.default_rng(seed + 1)
+    kolom = [
+        [str(i) for i in range(1, len(df) + 1)],
+        _tanggal(df["Tanggal"].to_numpy(), rng),
+        df["Kategori"].astype(str).to_numpy(dtype=object),
+        df["Kasir"].astype(str).to_numpy(dtype=object),
+        df["Uraian"].to_numpy(dtype=object),
+        _rupiah(df["UMK"].to_numpy()),
+        _rupiah(df["SPJ"].to_numpy()),
+        df["Keterangan"].to_numpy(dtype=object),
+    ]
+    return [list(HEADER)] + [list(r) for r in zip(*kolom)]
+
+
+def buat_grid_tenggat(n, seed=0):
+    """Grid sheet Tenggat Waktu: ``n`` UMK terbuka + sisa hari dan link WhatsApp."""
+    rng = np.random.default_rng(seed + 2)
+    df = buat_ledger(max(4 * n, 4), seed)
+    df = df[df["UMK"] > 0].tail(n).reset_index(drop=True)
+    tenggat = df["Tanggal"] + pd.Timedelta(days=21)
+    # Sisa Hari tersebar di semua warna (lewat tenggat, ≤5, ≤10, ≤21, >21)
+    sisa = pd.Series(rng.integers(-5, 30, len(df)))
+    nomor = rng.integers(10**9, 10**10, len(df))
+    kolom = [
+        [str(i) for i in range(1, len(df) + 1)],
+        df["Tanggal"].dt.strftime("%d-%m-%Y"),
+        df["Kategori"].astype(str),
+        df["Kasir"].astype(str),
+        df["Uraian"],
+        _rupiah(df["UMK"].to_numpy()),
+        [""] * len(df),
+        df["Keterangan"],
+        tenggat.dt.strftime("%d-%m-%Y"),
+        sisa.astype(str),
+        [f"https://wa.me/628{k}" for k in nomor],
+    ]
+    return [list(HEADER_TENGGAT)] + [list(r) for r in zip(*kolom)]
+
+
+# ------------------------
+# GOOGLE SHEETS PALSU
+# Cukup untuk jalur yang dipakai kasva.sheets: values_batch_get, worksheet(),
+# get_values/get_all_records dan append_rows. Respons dilewatkan JSON
+# encode/decode supaya biaya dekode payload ikut terukur, dan tiap panggilan
+# dicatat (jumlah + byte) seperti di API asli.
+# ------------------------
+
+
+def _kolom_ke_indeks(huruf):
+    return a1_to_rowcol(huruf + "1")[1] - 1
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, nama):
+        self.spreadsheet = spreadsheet
+        self.title = nama
+
+    @property
+    def grid(self):
+        return self.spreadsheet.sheets[self.title]
+
+    def get_values(self, range_name=None, **kwargs):
+        return self.spreadsheet._kirim(self.grid)
+
+    get_all_values = get_values
+
+    def get_all_records(self, **kwargs):
+        values = self.get_values()
+        return to_records(values[0], values[1:]) if values else []
+
+    def append_rows(self, values, table_range=None, **kwargs):
+        awal = len(self.grid) + 1
+        for r in values:
+            self.grid.append([str(len(self.grid))] + list(r))
+        self.spreadsheet.panggilan += 1
+        return {"updates": {"updatedRange": f"'{self.title}'!B{awal}:H{awal + len(values) - 1}"}}
+
+    def append_row(self, values, table_range=None, **kwargs):
+        return self.append_rows([values], table_range)
+
+    def update_acell(self, label, value):
+        baris, kolom = a1_to_rowcol(label)
+        row = self.grid[baris - 1]
+        row.extend([""] * (kolom - len(row)))
+        row[kolom - 1] = value
+        self.spreadsheet.panggilan += 1
+
+
+class FakeSpreadsheet:
+    """Spreadsheet di memori; ``sheets`` = dict nama → grid (list of list)."""
+
+    def __init__(self, sheets):
+        self.sheets = sheets
+        self.panggilan = 0
+        self.byte = 0
+
+    def worksheet(self, nama):
+        return FakeWorksheet(self, nama)
+
+    def _kirim(self, isi):
+        payload = json.dumps(isi, ensure_ascii=False).encode("utf-8")
+        self.panggilan += 1
+        self.byte += len(payload)
+        return json.loads(payload)
+
+    def _potong(self, rentang):
+        # "'Data'!A2:H", "'Data'!A:H", "'Data Kasir'!B:B", "'Tenggat Waktu'"
+        nama, _, sel = rentang.partition("!")
+        grid = self.sheets[nama.strip("'")]
+        if not sel:
+            return grid
+        m = re.fullmatch(r"([A-Z]+)(\d*):([A-Z]+)(\d*)", sel)
+        k0, k1 = _kolom_ke_indeks(m.group(1)), _kolom_ke_indeks(m.group(3)) + 1
+        b0 = int(m.group(2) or 1) - 1
+        b1 = int(m.group(4)) if m.group(4) else len(grid)
+        return [r[k0:k1] for r in grid[b0:b1]]
+
+    def values_batch_get(self, ranges, params=None):
+        hasil = [{"range": r, "majorDimension": "ROWS", "values": self._potong(r)} for r in ranges]
+        return self._kirim({"valueRanges": hasil})
+
+
+def pasang(spreadsheet):
+    """Arahkan kasva.sheets ke spreadsheet palsu (tanpa kredensial/network)."""
+    from kasva import sheets
+
+    sheets.get_spreadsheet = lambda credentials_file=None: spreadsheet
+    sheets.worksheet = lambda nama, credentials_file=None: spreadsheet.worksheet(nama)
+    return spreadsheet
@@ -1,22 +1,24 @@
+import os
+
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import pandas as pd
 
+from kasva import sheets
+from kasva.data import grid_to_frame
 
-# --- SETUP GOOGLE SHEET ---
-scope = ["https://spreadsheets.google.com/feeds",
-         "https://www.googleapis.com/auth/drive"]
 
-creds = ServiceAccountCredentials.from_json_keyfile_name(
-    r"C:/Users/MyBook Hype AMD/Videos/Program Python/Dashboard Arus Kas/proven-mystery-471102-k6-0d7bdda0bcd4.json",
-    scope
+# --- SETUP GOOGLE SHEET (client & spreadsheet dibagi lewat kasva/sheets.py) ---
+# Login sekarang lewat google-auth (bukan oauth2client); file JSON service account
+# yang sama tetap bisa dipakai. Tanpa KASVA_CREDENTIALS, script ini tetap membaca
+# file kredensial di lokasi lamanya (dashboard memakai folder Videos/Dashboard Arus Kas).
+# Path dioper per panggilan, bukan mengubah sheets.CREDENTIALS_FILE untuk semua pemakai.
+CREDENTIALS_FILE = os.environ.get(
+    "KASVA_CREDENTIALS",
+    r"C:/Users/MyBook Hype AMD/Videos/Program Python/Dashboard Arus Kas/"
+    r"proven-mystery-471102-k6-0d7bdda0bcd4.json",
 )
-client = gspread.authorize(creds)
-
-SHEET_ID = "1JN7XPhIMVwcd982JcwzdGQoYu9MJFghofb0ImmZUUYc"
+SHEET_ID = sheets.SHEET_ID
 SHEET_NAME = "Data"
-sheet = client.open_by_key(SHEET_ID).worksheet(SHEET_NAME)
+sheet = sheets.worksheet(SHEET_NAME, CREDENTIALS_FILE)
 
 # --- STREAMLIT FORM ---
 st.set_page_config(page_title="Input Cash Flow", page_icon="📊", layout="centered")
@@ -44,8 +46,9 @@ with st.form("cashflow_form", clear_on_submit=True):
 
             row_data = [tanggal_str, kategori, kasir, uraian, umk, spj, keterangan]
 
-            # Cari row terakhir yang sudah terisi di kolom B (tanggal)
-            last_row = len(sheet.col_values(2)) + 1  
+            # Append di server (mulai kolom B supaya kolom A "No" auto terisi pakai formula);
+            # tidak perlu baca kolom B dulu dan aman kalau ada yang menyimpan bersamaan
+            last_row = sheets.append_row(SHEET_NAME, row_data, credentials_file=CREDENTIALS_FILE)
 
             # --- AUTO EXTEND TABLE RANGE ---
             # misalnya tabel sekarang punya range maksimal 200 row
@@ -58,9 +61,6 @@ with st.form("cashflow_form", clear_on_submit=True):
                 # jadi cara paling aman: perbesar manual range tabel waktu setup
                 st.info(f"Tabel otomatis diperpanjang ke {max_range} row")
 
-            # Update mulai kolom B (supaya kolom A "No" auto terisi pakai formula)
-            sheet.update(f"B{last_row}:H{last_row}", [row_data])
-
             st.success("✅ Data berhasil disimpan ke Google Sheet (auto masuk tabel)!")
             st.json({
                 "Tanggal": tanggal_str,
@@ -75,6 +75,5 @@ with st.form("cashflow_form", clear_on_submit=True):
 
 # --- OPSIONAL: Tampilkan tabel dari GSheet langsung ---
 st.subheader("📋 Data Cash Flow")
-data = sheet.get_all_records()
-df = pd.DataFrame(data)
+df = grid_to_frame(sheet.get_values())
 st.dataframe(df)
@@ -0,0 +1 @@
+# Modul bersama untuk dashboard KASVA (aruskas*.py, form_tambah.py)
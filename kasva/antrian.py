@@ -0,0 +1,217 @@
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+
+# ------------------------
+# ANTRIAN TULIS (write-behind)
+# Tombol "Simpan Data" cukup menaruh baris ke jurnal SQLite lokal lalu selesai.
+# Worker di background mengirim semua baris yang menunggu dalam satu panggilan
+# append. Kalau API 429/timeout/offline, baris tetap aman di jurnal dan dicoba
+# lagi dengan exponential backoff (juga setelah restart).
+#
+# Tiap baris punya kunci unik yang ikut ditulis ke tujuan. Kalau kirim gagal
+# dengan cara yang ambigu (timeout/5xx: bisa jadi append sudah diterapkan),
+# baris ditandai "dicoba" dan sebelum dikirim ulang kuncinya dicek dulu di
+# tujuan → tidak ada baris dobel. Hanya penolakan pasti (mis. 429) yang
+# langsung dikirim ulang tanpa cek. Baris yang ditolak permanen (mis. 400/403)
+# dipindah ke tabel gagal beserta pesan error-nya, supaya baris sesudahnya
+# tidak ikut tertahan di belakangnya.
+# ------------------------
+
+QUEUE_PATH = os.environ.get("KASVA_QUEUE", ".kasva_queue.db")
+
+BATCH_MAX = 500         # baris per panggilan kirim
+BACKOFF_AWAL = 2.0      # detik
+BACKOFF_MAKS = 300.0    # detik
+
+log = logging.getLogger(__name__)
+
+
+class WriteQueue:
+    """Jurnal baris tertunda + worker pengirim.
+
+    ``kirim(rows, kunci)`` dipanggil dengan list baris (list of list) dan list
+    kunci idempotensinya, dan harus raise kalau gagal; baris baru dihapus dari
+    jurnal setelah ``kirim`` sukses, lalu ``setelah_kirim()`` (opsional) dipanggil.
+
+    ``cek_terkirim(kunci)`` (opsional) → set kunci yang sudah ada di tujuan,
+    dipakai sebelum mengirim ulang baris yang gagal secara ambigu.
+    ``ditolak(error)`` (opsional) → True kalau error pasti terjadi sebelum
+    apa pun ditulis, sehingga aman dikirim ulang tanpa cek.
+    ``permanen(error)`` (opsional) → True kalau baris yang sama tidak akan pernah
+    diterima; baris itu dipindah ke tabel gagal (lihat ``daftar_gagal``).
+    """
+
+    def __init__(self, kirim, path=QUEUE_PATH, setelah_kirim=None,
+                 cek_terkirim=None, ditolak=None, permanen=None):
+        self.kirim = kirim
+        self.setelah_kirim = setelah_kirim
+        self.cek_terkirim = cek_terkirim
+        self.ditolak = ditolak or (lambda e: False)
+        self.permanen = permanen or (lambda e: False)
+        self._isolasi = False       # kirim satu per satu untuk mencari baris yang ditolak
+        self.path = path
+        self.gagal = 0              # jumlah gagal beruntun (untuk backoff)
+        self.coba_lagi = 0.0        # waktu paling cepat untuk mencoba kirim lagi
+        self.error_terakhir = None
+        self._lock = threading.Lock()
+        self._bangun = threading.Event()
+        with closing(self._connect()) as con, con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS pending ("
+                " id INTEGER PRIMARY KEY, payload TEXT NOT NULL, dibuat REAL NOT NULL,"
+                " kunci TEXT, dicoba INTEGER NOT NULL DEFAULT 0)"
+            )
+            # Jurnal versi lama: tambah kolom kunci/dicoba, beri kunci ke baris yang belum punya
+            kolom = {r[1] for r in con.execute("PRAGMA table_info(pending)")}
+            if "kunci" not in kolom:
+                con.execute("ALTER TABLE pending ADD COLUMN kunci TEXT")
+            if "dicoba" not in kolom:
+                con.execute("ALTER TABLE pending ADD COLUMN dicoba INTEGER NOT NULL DEFAULT 0")
+            con.execute("UPDATE pending SET kunci = lower(hex(randomblob(8))) WHERE kunci IS NULL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS gagal ("
+                " id INTEGER PRIMARY KEY, payload TEXT NOT NULL, dibuat REAL NOT NULL,"
+                " kunci TEXT, error TEXT NOT NULL, ditolak REAL NOT NULL)"
+            )
+        self._worker = threading.Thread(target=self._loop, name="kasva-antrian", daemon=True)
+        self._worker.start()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def put(self, row):
+        """Simpan baris ke jurnal lalu bangunkan worker. Return id jurnal."""
+        with closing(self._connect()) as con, con:
+            cur = con.execute(
+                "INSERT INTO pending (payload, dibuat, kunci) VALUES (?, ?, ?)",
+                (json.dumps(row, ensure_ascii=False), time.time(), uuid.uuid4().hex[:16]),
+            )
+        self._bangun.set()
+        return cur.lastrowid
+
+    def depth(self):
+        """Jumlah baris yang belum terkirim."""
+        with closing(self._connect()) as con:
+            return con.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def pending(self):
+        """Baris yang belum terkirim (urut masuk)."""
+        with closing(self._connect()) as con:
+            rows = con.execute("SELECT payload FROM pending ORDER BY id").fetchall()
+        return [json.loads(p) for (p,) in rows]
+
+    def _tunda(self, n):
+        # Exponential backoff + jitter setelah gagal
+        self.gagal += 1
+        tunda = min(BACKOFF_MAKS, BACKOFF_AWAL * 2 ** (self.gagal - 1))
+        self.coba_lagi = time.time() + tunda * random.uniform(0.8, 1.2)
+        log.warning("Kirim antrian gagal (%d baris), coba lagi %.0f detik",
+                    n, tunda, exc_info=True)
+
+    def _hapus(self, ids):
+        with closing(self._connect()) as con, con:
+            con.executemany("DELETE FROM pending WHERE id = ?", [(i,) for i in ids])
+        if self.setelah_kirim is not None:
+            self.setelah_kirim()
+
+    def daftar_gagal(self):
+        """Baris yang ditolak permanen (urut masuk): list dict payload, error, dibuat, ditolak."""
+        with closing(self._connect()) as con:
+            rows = con.execute(
+                "SELECT payload, error, dibuat, ditolak FROM gagal ORDER BY id"
+            ).fetchall()
+        return [{"payload": json.loads(p), "error": e, "dibuat": d, "ditolak": t}
+                for p, e, d, t in rows]
+
+    def _pindah_gagal(self, id_, error):
+        with closing(self._connect()) as con, con:
+            con.execute(
+                "INSERT INTO gagal (payload, dibuat, kunci, error, ditolak)"
+                " SELECT payload, dibuat, kunci, ?, ? FROM pending WHERE id = ?",
+                (error, time.time(), id_),
+            )
+            con.execute("DELETE FROM pending WHERE id = ?", (id_,))
+        log.error("Baris antrian %d ditolak permanen, dipindah ke tabel gagal: %s", id_, error)
+        if self.setelah_kirim is not None:
+            self.setelah_kirim()
+
+    def _tandai(self, ids, dicoba):
+        with closing(self._connect()) as con, con:
+            con.executemany("UPDATE pending SET dicoba = ? WHERE id = ?",
+                            [(dicoba, i) for i in ids])
+
+    def flush(self):
+        """Kirim baris tertunda (digabung per BATCH_MAX). Return jumlah baris terkirim."""
+        with self._lock:
+            if time.time() < self.coba_lagi:
+                return 0
+            terkirim = 0
+            while True:
+                with closing(self._connect()) as con:
+                    batch = con.execute(
+                        "SELECT id, payload, kunci, dicoba FROM pending ORDER BY id LIMIT ?",
+                        (1 if self._isolasi else BATCH_MAX,),
+                    ).fetchall()
+                if not batch:
+                    self._isolasi = False
+                    return terkirim
+
+                ragu = [k for _, _, k, dicoba in batch if dicoba]
+                if ragu and self.cek_terkirim is not None:
+                    # Percobaan sebelumnya gagal ambigu → cek dulu mana yang sudah masuk
+                    try:
+                        sudah = self.cek_terkirim(ragu)
+                    except Exception as e:
+                        self.error_terakhir = str(e)
+                        self._tunda(len(batch))
+                        return terkirim
+                    if sudah:
+                        log.info("%d baris antrian ternyata sudah terkirim", len(sudah))
+                        self._hapus([i for i, _, k, _ in batch if k in sudah])
+                        terkirim += len(sudah)
+                        batch = [b for b in batch if b[2] not in sudah]
+                        if not batch:
+                            continue
+
+                ids = [i for i, _, _, _ in batch]
+                # Ditandai sebelum kirim: kalau proses mati di tengah kirim, tetap dicek dulu
+                self._tandai(ids, 1)
+                try:
+                    self.kirim([json.loads(p) for _, p, _, _ in batch], [k for _, _, k, _ in batch])
+                except Exception as e:
+                    if self.ditolak(e):
+                        # Pasti belum ada yang ditulis → kirim ulang biasa
+                        self._tandai(ids, 0)
+                    if self.permanen(e):
+                        if len(batch) > 1:
+                            # Satu baris (belum tahu yang mana) merusak seluruh batch →
+                            # kirim satu per satu sampai antrian kosong
+                            self._isolasi = True
+                        else:
+                            self._pindah_gagal(ids[0], str(e))
+                        continue
+                    self.error_terakhir = str(e)
+                    self._tunda(len(batch))
+                    return terkirim
+                self._hapus(ids)
+                self.gagal = 0
+                self.error_terakhir = None
+                terkirim += len(batch)
+
+    def _loop(self):
+        while True:
+            # Tidur sampai ada baris baru atau jadwal backoff berikutnya
+            tunggu = max(1.0, self.coba_lagi - time.time()) if self.gagal else 30.0
+            self._bangun.wait(timeout=tunggu)
+            self._bangun.clear()
+            try:
+                self.flush()
+            except Exception:
+                log.exception("Worker antrian error")
@@ -0,0 +1,346 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from kasva import mirror, sheets
+from kasva.ledger import BalanceIndex, CompactLedger, gabung_ledger
+from kasva.parse import parse_rupiah_cek, parse_tanggal
+from kasva.sync import LedgerSync
+
+# ------------------------
+# LAPISAN AKSES DATA
+# Semua pembacaan worksheet Data / Data Kasir / Tenggat Waktu lewat sini,
+# hasilnya di-cache (dibagi ke semua sesi) supaya rerun tidak bolak-balik
+# ke Google Sheets.
+# ------------------------
+
+# Umur cache dalam detik, bisa diatur lewat env KASVA_CACHE_TTL
+CACHE_TTL = int(os.environ.get("KASVA_CACHE_TTL", "300"))
+
+# Range yang diambil saat load (satu panggilan batchGet untuk semuanya)
+RANGE_KASIR = "'Data Kasir'!B:B"
+RANGE_TENGGAT = "'Tenggat Waktu'"
+
+# Kolom B-H sheet Data (urutan baris overlay/write-through)
+OVERLAY_COLS = ["Tanggal", "Kategori", "Kasir", "Uraian", "UMK", "SPJ", "Keterangan"]
+
+# Tipe kolom ledger hasil ingest (kolom lain disimpan sebagai teks)
+KOLOM_UANG = ("UMK", "SPJ")
+KOLOM_KATEGORI = ("Kategori", "Kasir")
+
+# Penanda baris dengan UMK/SPJ terisi tapi tidak terbaca (dihitung 0, lihat load_nominal_gagal)
+KOLOM_NOMINAL_GAGAL = "Nominal Gagal"
+
+
+@dataclass
+class SheetBundle:
+    data: pd.DataFrame = field(default_factory=pd.DataFrame)      # ledger bersih
+    kasir: list = field(default_factory=list)                      # nama kasir
+    tenggat: pd.DataFrame = field(default_factory=pd.DataFrame)   # sheet Tenggat Waktu
+
+
+log = logging.getLogger(__name__)
+
+
+@st.cache_resource
+def _state():
+    # Satu objek per proses server → versi data sama untuk semua sesi.
+    # versi      : versi ledger yang dilihat dashboard (naik juga saat ada baris lokal)
+    # versi_sheet: versi hasil sinkron Google Sheets (naik hanya kalau perlu fetch)
+    # overlay    : fungsi → baris lokal yang belum ada di sheet (mis. antrian tulis)
+    # snapshot: bundle dari mirror lokal (disajikan selama sinkron awal masih jalan)
+    # menyegarkan: sinkron awal di background sedang jalan
+    # prefetch: bundle hasil sinkron background, diambil oleh _load_bundle berikutnya
+    return {"versi": 0, "versi_sheet": 0, "overlay": None,
+            "hangat": False, "snapshot": None, "menyegarkan": False, "prefetch": None,
+            "lock": threading.Lock()}
+
+
+def data_version():
+    return _state()["versi"]
+
+
+def touch():
+    """Naikkan versi data tanpa sinkron ulang ke sheet (write-through baris lokal)."""
+    state = _state()
+    # += bukan operasi atomik; simpan bersamaan dari beberapa sesi tidak boleh hilang
+    with state["lock"]:
+        state["versi"] += 1
+    _load_compact_ledger.clear()
+    _load_balance_index.clear()
+
+
+def sheet_rows():
+    """Jumlah baris sheet Data (termasuk header) per sinkron terakhir."""
+    return _ledger_sync().n_rows
+
+
+def set_overlay(sumber):
+    """Daftarkan ``sumber()`` → list baris B-H yang ditumpuk di atas ledger hasil sinkron."""
+    _state()["overlay"] = sumber
+
+
+def invalidate():
+    """Naikkan versi data dan buang cache lama (dipanggil setelah menulis ke sheet)."""
+    state = _state()
+    with state["lock"]:
+        state["versi_sheet"] += 1
+        state["versi"] += 1
+    _load_compact_ledger.clear()
+    _load_bundle.clear()
+    _load_tanggal_gagal.clear()
+    _load_nominal_gagal.clear()
+    _load_balance_index.clear()
+
+
+def grid_to_frame(values):
+    # Baris pertama = header, sisanya data (pengganti get_all_records)
+    if not values:
+        return pd.DataFrame()
+    header = values[0]
+    rows = [r + [""] * (len(header) - len(r)) for r in values[1:]]
+    return pd.DataFrame([r[:len(header)] for r in rows], columns=header)
+
+
+def grid_columns(values):
+    """Grid mentah (header + baris) → (header, list kolom), tanpa parse apa pun."""
+    header = [str(h) for h in values[0]]
+    n = len(values) - 1
+    # zip_longest = transpose + isi sel yang kurang di ujung baris dengan ""
+    kolom = list(itertools.zip_longest(*values[1:], fillvalue=""))[:len(header)]
+    kolom += [("",) * n] * (len(header) - len(kolom))
+    return header, kolom
+
+
+def columns_to_ledger(header, kolom):
+    """Kolom mentah hasil ``grid_columns`` → ledger bertipe (lihat grid_to_ledger)."""
+    n = len(kolom[0]) if kolom else 0
+    df = pd.DataFrame(index=pd.RangeIndex(n))
+    nominal_gagal = np.zeros(n, dtype=bool)
+    for nama, isi in zip(header, kolom):
+        s = pd.Series(isi, dtype=object)
+        if nama in KOLOM_UANG:
+            df[nama], gagal = parse_rupiah_cek(s)
+            nominal_gagal |= gagal.to_numpy()
+        elif nama == "Tanggal":
+            df[nama] = parse_tanggal(s)
+        elif nama in KOLOM_KATEGORI:
+            df[nama] = s.astype(str).astype("category")
+        else:
+            df[nama] = s.astype(str)
+    df[KOLOM_NOMINAL_GAGAL] = nominal_gagal
+
+    if "Tanggal" in df.columns:
+        # Baris tanpa tanggal (baris kosong) dibuang; tanggal yang tidak terbaca
+        # tetap disimpan sebagai NaT supaya bisa dilaporkan (lihat load_tanggal_gagal)
+        i_tgl = header.index("Tanggal")
+        terisi = pd.Series(kolom[i_tgl], dtype=object).astype(str).str.strip().ne("")
+        df = df[terisi.to_numpy() | df["Tanggal"].notna().to_numpy()]
+    return df
+
+
+def grid_to_ledger(values):
+    """Grid mentah sheet Data (header + baris) → ledger bertipe, langsung per kolom.
+
+    Tanpa dict per baris (get_all_records) dan tanpa DataFrame per baris:
+    grid di-transpose sekali, lalu tiap kolom diparse vectorized.
+    Tanggal → datetime64, UMK/SPJ → int64 rupiah, Kategori/Kasir → category.
+    Sel angka (render UNFORMATTED_VALUE) dipakai apa adanya, tidak lewat teks.
+    """
+    if not values:
+        return pd.DataFrame()
+    return columns_to_ledger(*grid_columns(values))
+
+
+@st.cache_resource
+def _ledger_sync():
+    # Watermark sinkron sheet Data, dibagi semua sesi
+    return LedgerSync("Data", parse=grid_to_ledger)
+
+
+def fetch_bundle():
+    """Sinkron ke Google Sheets sekarang (tanpa cache), simpan mirror, return SheetBundle."""
+    sync = _ledger_sync()
+    with sync.lock:
+        # Sheet Data cukup diambil baris barunya (plus ekor untuk cek checksum)
+        grid_data, grid_kasir, grid_tw = sheets.batch_values(
+            [sync.next_range(), RANGE_KASIR, RANGE_TENGGAT]
+        )
+        if not sync.apply(grid_data):
+            # Ada edit di atas watermark → reload penuh
+            sync.reset()
+            (grid_data,) = sheets.batch_values([sync.next_range()])
+            sync.apply(grid_data)
+        bundle = SheetBundle(
+            data=sync.frame,
+            kasir=[r[0] for r in grid_kasir[1:] if r and r[0]],
+            tenggat=grid_to_frame(grid_tw),
+        )
+        mirror.simpan(bundle.data, bundle.kasir, bundle.tenggat,
+                      {"sync": sync.dump(), "disimpan": time.time()})
+    # Sudah ada data segar → snapshot mirror tidak dipakai lagi
+    _state()["snapshot"] = None
+    return bundle
+
+
+def _refresh_background():
+    state = _state()
+    try:
+        bundle = fetch_bundle()
+    except Exception:
+        # _load_bundle berikutnya (cache kedaluwarsa / invalidate) fetch ulang sendiri
+        state["menyegarkan"] = False
+        log.warning("Sinkron awal ke Google Sheets gagal", exc_info=True)
+        return
+    # Prefetch dulu baru flag dimatikan: rerun di antaranya tetap dapat snapshot
+    # (atau prefetch ini), tidak memicu sinkron penuh kedua
+    state["prefetch"] = bundle
+    state["menyegarkan"] = False
+    invalidate()
+
+
+def _warm_start():
+    # Sekali per proses: pulihkan snapshot + watermark dari mirror lokal
+    state = _state()
+    with state["lock"]:
+        if state["hangat"]:
+            return
+        state["hangat"] = True
+        snap = mirror.muat()
+        if snap is None:
+            return
+        _ledger_sync().restore(snap["meta"]["sync"], snap["data"])
+        state["snapshot"] = SheetBundle(data=snap["data"], kasir=snap["kasir"],
+                                        tenggat=snap["tenggat"])
+        if mirror.OFFLINE:
+            return
+        # Diset di dalam lock: sesi lain tidak boleh melihat snapshot tanpa flag ini
+        state["menyegarkan"] = True
+    threading.Thread(target=_refresh_background, daemon=True).start()
+
+
+@st.cache_resource(ttl=CACHE_TTL, show_spinner=False)
+def _load_bundle(versi):
+    state = _state()
+    if state["prefetch"] is not None:
+        bundle, state["prefetch"] = state["prefetch"], None
+        return bundle
+    if state["snapshot"] is not None and (state["menyegarkan"] or mirror.OFFLINE):
+        # Sinkron background belum selesai (atau mode offline) → sajikan snapshot terakhir
+        return state["snapshot"]
+    if mirror.OFFLINE:
+        return SheetBundle()
+    try:
+        return fetch_bundle()
+    except Exception:
+        if state["snapshot"] is None:
+            raise
+        # Sinkron awal gagal dan fetch ulang juga gagal → snapshot dulu,
+        # dicoba lagi saat cache ini kedaluwarsa atau di-invalidate
+        log.warning("Sinkron ke Google Sheets gagal, pakai mirror lokal", exc_info=True)
+        return state["snapshot"]
+
+
+def load_bundle():
+    """Data, Data Kasir, dan Tenggat Waktu sekaligus (satu round trip saat cache kosong)."""
+    _warm_start()
+    return _load_bundle(_state()["versi_sheet"])
+
+
+@st.cache_resource(ttl=CACHE_TTL, show_spinner=False)
+def _load_compact_ledger(versi, versi_sheet):
+    # cache_resource: satu ledger kompak per versi, dibagi read-only ke semua sesi
+    # (cache_data akan men-copy seluruh ledger untuk tiap pemanggil)
+    data = _load_bundle(versi_sheet).data
+    sumber = _state()["overlay"]
+    rows = sumber() if sumber is not None else []
+    if rows:
+        # Baris yang baru disimpan tapi belum terkirim/tersinkron langsung ikut tampil
+        lokal = grid_to_ledger([OVERLAY_COLS] + rows)
+        data = gabung_ledger([data, lokal])
+    if "Tanggal" in data.columns:
+        data = data[data["Tanggal"].notna()]
+    return CompactLedger(data)
+
+
+def load_compact_ledger():
+    """Ledger kompak bersama (CompactLedger) untuk versi data sekarang."""
+    _warm_start()
+    state = _state()
+    return _load_compact_ledger(state["versi"], state["versi_sheet"])
+
+
+def load_ledger_status():
+    """(CompactLedger, status pelunasan UMK) dari versi data yang sama.
+
+    Status = hasil hitung_tenggat seluruh ledger, index = posisi baris ledger kompak
+    (ambil baris hasil filter dengan ``status.iloc[ledger.select(...)]``).
+    """
+    led = load_compact_ledger()
+    return led, led.status_umk
+
+
+def load_data():
+    """Ledger sheet Data yang sudah dibersihkan (UMK/SPJ angka, Tanggal datetime).
+
+    Salinan dangkal milik pemanggil (copy-on-write), aman diubah.
+    """
+    return load_compact_ledger().frame()
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _load_tanggal_gagal(versi_sheet):
+    data = _load_bundle(versi_sheet).data.drop(columns=KOLOM_NOMINAL_GAGAL, errors="ignore")
+    if "Tanggal" not in data.columns:
+        return data
+    return data[data["Tanggal"].isna()]
+
+
+def load_tanggal_gagal():
+    """Baris sheet Data yang Tanggal-nya terisi tapi tidak terbaca (tidak ikut load_data)."""
+    _warm_start()
+    return _load_tanggal_gagal(_state()["versi_sheet"])
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _load_nominal_gagal(versi_sheet):
+    data = _load_bundle(versi_sheet).data
+    if KOLOM_NOMINAL_GAGAL not in data.columns:
+        return data.iloc[:0]
+    # Mirror versi lama belum punya kolom penanda → NaN dianggap terbaca
+    gagal = data[KOLOM_NOMINAL_GAGAL].fillna(False).astype(bool)
+    return data[gagal].drop(columns=KOLOM_NOMINAL_GAGAL)
+
+
+def load_nominal_gagal():
+    """Baris sheet Data yang UMK/SPJ-nya terisi tapi tidak terbaca (ikut load_data sebagai 0)."""
+    _warm_start()
+    return _load_nominal_gagal(_state()["versi_sheet"])
+
+
+def load_kasir():
+    """Daftar nama kasir dari kolom B sheet Data Kasir."""
+    return list(load_bundle().kasir)
+
+
+def load_tenggat():
+    """Isi sheet Tenggat Waktu apa adanya."""
+    return load_bundle().tenggat.copy(deep=False)
+
+
+@st.cache_resource(ttl=CACHE_TTL, show_spinner=False)
+def _load_balance_index(versi):
+    # cache_resource: objek dibagi read-only ke semua sesi (tidak di-copy tiap rerun)
+    return BalanceIndex(load_data())
+
+
+def load_balance_index():
+    """Indeks saldo kumulatif per (Kategori, Kasir) untuk versi data sekarang."""
+    return _load_balance_index(data_version())
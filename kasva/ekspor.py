@@ -0,0 +1,82 @@
+import importlib.util
+import io
+
+import pandas as pd
+import streamlit as st
+
+from kasva.data import CACHE_TTL
+
+# ------------------------
+# EKSPOR DATA
+# File baru dibuat saat tombol download diklik (data callable), lalu di-cache
+# per (versi data, filter, format). Kolom tetap bertipe: Tanggal tanggal,
+# UMK/SPJ/Sisa Saldo angka rupiah (bukan teks "Rp...").
+# ------------------------
+
+# Baris per potongan saat menulis CSV / row group Parquet
+CHUNK = 50_000
+
+KOLOM_EKSPOR = ["Tanggal", "Kategori", "Kasir", "Uraian", "UMK", "SPJ",
+                "Sisa Saldo", "Tenggat Waktu", "Keterangan"]
+
+# format → (ekstensi, mime)
+FORMAT = {
+    "CSV": ("csv", "text/csv"),
+    "XLSX": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+# XLSX butuh openpyxl (opsional); tanpa itu pilihan XLSX tidak ditampilkan
+FORMAT_TERSEDIA = [f for f in FORMAT if f != "XLSX" or importlib.util.find_spec("openpyxl")]
+
+
+def frame_ekspor(df):
+    """Hasil ``backend.load_ledger_tenggat`` + Sisa Saldo → kolom KOLOM_EKSPOR.
+
+    Tenggat Waktu hanya untuk UMK yang masih ada sisa (pelunasan sudah dihitung
+    backend atas seluruh ledger, bukan hanya baris hasil filter).
+    """
+    df = df.copy()
+    df["Tenggat Waktu"] = df["Tenggat Waktu"].where(df["Sisa UMK"] > 0)
+    return df.reindex(columns=KOLOM_EKSPOR)
+
+
+def _csv(df):
+    # Ditulis per potongan langsung sebagai bytes → tidak ada string CSV utuh plus
+    # salinan hasil encode-nya. File akhirnya tetap satu objek bytes (download_button
+    # dan cache butuh isi utuh); getvalue() tidak menyalin buffer, jadi puncak memori
+    # ≈ 1,5× ukuran file (to_csv sekali jalan + encode ≈ 5×).
+    buf = io.BytesIO()
+    buf.write("\ufeff".encode("utf-8"))     # BOM, supaya Excel membaca UTF-8
+    for awal in range(0, max(len(df), 1), CHUNK):
+        teks = df.iloc[awal:awal + CHUNK].to_csv(index=False, header=awal == 0,
+                                                  date_format="%d-%m-%Y")
+        buf.write(teks.encode("utf-8"))
+    return buf.getvalue()
+
+
+def _xlsx(df):
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name="Data")
+    return buf.getvalue()
+
+
+def _parquet(df):
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False, row_group_size=CHUNK)
+    return buf.getvalue()
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=16, show_spinner=False)
+def _buat_file(versi, filter_, fmt, _df):
+    df = frame_ekspor(_df)
+    return {"CSV": _csv, "XLSX": _xlsx, "Parquet": _parquet}[fmt](df)
+
+
+def pembuat(df, fmt, versi, filter_):
+    """Callable untuk ``st.download_button(data=...)``: file dibuat hanya saat diklik.
+
+    ``versi`` + ``filter_`` (tuple) menjadi kunci cache; ``df`` = ledger terfilter.
+    """
+    return lambda: _buat_file(versi, filter_, fmt, _df=df)
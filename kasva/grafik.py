@@ -0,0 +1,93 @@
+import os
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from kasva.data import CACHE_TTL
+
+# ------------------------
+# GRAFIK DASHBOARD
+# Data grafik diambil dari kubus rollup backend lalu dipotong ke top-N grup
+# (sisanya digabung jadi satu batang "Lainnya"), jadi spec Vega-Lite yang
+# dikirim ke browser tetap kecil berapa pun banyaknya uraian dalam setahun.
+# Objek chart di-cache per (versi data, filter, N) dan dipakai ulang antar rerun.
+# ------------------------
+
+# Jumlah grup maksimal per grafik, bisa diatur lewat env KASVA_GRAFIK_TOP_N
+TOP_N = int(os.environ.get("KASVA_GRAFIK_TOP_N", "15"))
+
+LAINNYA = "Lainnya"
+
+WARNA_UMK_SPJ = alt.Scale(domain=["UMK", "SPJ"], range=["#FC5185", "#3FC1C9"])
+
+
+def top_n(df, kolom, nilai, n=TOP_N):
+    """``n`` baris terbesar (menurut jumlah kolom ``nilai``) + satu baris "Lainnya".
+
+    Urutan hasil: terbesar dulu, "Lainnya" paling akhir.
+    """
+    nilai = [nilai] if isinstance(nilai, str) else list(nilai)
+    df = df[[kolom] + nilai].assign(**{kolom: df[kolom].astype(str)})
+    df = df.iloc[df[nilai].sum(axis=1).argsort(kind="stable")[::-1]]
+    if len(df) <= n:
+        return df.reset_index(drop=True)
+    sisa = df.iloc[n:]
+    lainnya = {kolom: f"{LAINNYA} ({len(sisa)})", **{k: sisa[k].sum() for k in nilai}}
+    return pd.concat([df.iloc[:n], pd.DataFrame([lainnya])], ignore_index=True)
+
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=64, show_spinner=False)
+def _spj_per_uraian(versi, tahun, kategori, kasir, n, _backend):
+    data = _backend.rollup("Uraian", tahun, kategori, kasir)
+    data = top_n(data[data["SPJ"] > 0], "Uraian", "SPJ", n)
+    if data.empty:
+        return None
+    return alt.Chart(data).mark_bar(color="#FC5185").encode(
+        x=alt.X("Uraian:N", sort=None, title="Uraian"),
+        y=alt.Y("SPJ:Q", title="Total SPJ (Rp)"),
+        tooltip=["Uraian", alt.Tooltip("SPJ", format=",")]
+    ).properties(height=350)
+
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=64, show_spinner=False)
+def _proporsi_kategori(versi, tahun, kategori, kasir, n, _backend):
+    data = _backend.rollup("Kategori", tahun, kategori, kasir)
+    data = top_n(data[data["SPJ"] > 0], "Kategori", "SPJ", n)
+    if data.empty:
+        return None
+    return alt.Chart(data).mark_arc(innerRadius=50).encode(
+        color=alt.Color("Kategori:N", title="Kategori", sort=None),
+        theta=alt.Theta("SPJ:Q"),
+        tooltip=["Kategori", alt.Tooltip("SPJ", format=",")]
+    ).properties(height=350)
+
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=64, show_spinner=False)
+def _umk_spj_kategori(versi, tahun, kategori, kasir, n, _backend):
+    data = _backend.rollup("Kategori", tahun, kategori, kasir)
+    data = top_n(data, "Kategori", ["UMK", "SPJ"], n)
+    if data.empty:
+        return None
+    data = data.melt("Kategori", var_name="Jenis", value_name="Jumlah")
+    return alt.Chart(data).mark_bar().encode(
+        x=alt.X("Kategori:N", title="Kategori", sort=None),
+        y=alt.Y("Jumlah:Q", title="Jumlah (Rp)"),
+        color=alt.Color("Jenis:N", scale=WARNA_UMK_SPJ),
+        xOffset="Jenis:N"
+    ).properties(height=350)
+
+
+def spj_per_uraian(backend, tahun=None, kategori=None, kasir=None, n=TOP_N):
+    """Bar SPJ per Uraian (top-N + Lainnya), atau None kalau belum ada SPJ."""
+    return _spj_per_uraian(backend.data_version(), tahun, kategori, kasir, n, _backend=backend)
+
+
+def proporsi_kategori(backend, tahun=None, kategori=None, kasir=None, n=TOP_N):
+    """Donut proporsi SPJ per Kategori, atau None kalau belum ada SPJ."""
+    return _proporsi_kategori(backend.data_version(), tahun, kategori, kasir, n, _backend=backend)
+
+
+def umk_spj_kategori(backend, tahun=None, kategori=None, kasir=None, n=TOP_N):
+    """Bar UMK vs SPJ per Kategori, atau None kalau tidak ada data."""
+    return _umk_spj_kategori(backend.data_version(), tahun, kategori, kasir, n, _backend=backend)
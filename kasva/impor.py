@@ -0,0 +1,43 @@
+"""Isi database SQLite (KASVA_BACKEND=sqlite) dari Google Sheets atau mirror lokal.
+
+    python -m kasva.impor                      # sinkron dari Google Sheets
+    python -m kasva.impor --sumber mirror      # dari snapshot mirror lokal (offline)
+    python -m kasva.impor --db data/kasva.db
+
+Isi database diganti seluruhnya (ledger, Data Kasir, Tenggat Waktu); versi
+data ikut naik sehingga dashboard yang sedang jalan memuat ulang.
+"""
+import argparse
+import sys
+
+from kasva import data as kasva_data
+from kasva import mirror
+from kasva.storage import SQLITE_PATH, SQLiteBackend
+
+
+def ambil(sumber):
+    """(ledger, kasir, tenggat) dari ``sumber`` ("sheets" atau "mirror")."""
+    if sumber == "mirror":
+        snap = mirror.muat()
+        if snap is None:
+            raise SystemExit(f"Mirror lokal belum ada di {mirror.MIRROR_DIR}")
+        return snap["data"], snap["kasir"], snap["tenggat"]
+    bundle = kasva_data.fetch_bundle()
+    return bundle.data, bundle.kasir, bundle.tenggat
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sumber", choices=["sheets", "mirror"], default="sheets")
+    ap.add_argument("--db", default=SQLITE_PATH, help="file SQLite (default KASVA_SQLITE)")
+    args = ap.parse_args()
+
+    ledger, kasir, tenggat = ambil(args.sumber)
+    backend = SQLiteBackend(args.db)
+    backend.import_frames(ledger, kasir, tenggat)
+    print(f"{len(ledger):,} baris ledger, {len(kasir)} kasir, {len(tenggat)} baris tenggat "
+          f"→ {args.db} (versi {backend.data_version()})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
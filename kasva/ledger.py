@@ -0,0 +1,302 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+# ------------------------
+# LEDGER: Sisa Saldo berjalan (vectorized, tanpa iterrows)
+# mode "berjalan" : sisa_i = sisa_(i-1) - SPJ_i + UMK_i
+# mode "umk_awal" : aturan lama aruskas.py → baris pertama tiap grup = UMK
+#                   (SPJ di baris pertama diabaikan), baris berikutnya seperti "berjalan"
+# ------------------------
+
+MODES = ("berjalan", "umk_awal")
+
+
+def kode_grup(df, by=None):
+    """Kode integer per grup ``by`` (factorize tiap kolom; kosong/NaN = grup sendiri)."""
+    keys = [by] if isinstance(by, str) else list(by or [])
+    codes = np.zeros(len(df), dtype=np.int64)
+    for k in keys:
+        kode, uniq = pd.factorize(df[k], use_na_sentinel=False)
+        codes = codes * len(uniq) + kode
+    return codes
+
+
+def gabung_ledger(frames):
+    """pd.concat beberapa potongan ledger; kolom category tetap category.
+
+    (concat biasa jatuh ke object kalau daftar kategorinya beda.)
+    """
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    hasil = pd.concat(frames, ignore_index=True)
+    for kol, dtype in frames[0].dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and not isinstance(hasil[kol].dtype, pd.CategoricalDtype):
+            hasil[kol] = hasil[kol].astype("category")
+    return hasil
+
+
+def hitung_sisa_saldo(df, by=None, mode="berjalan"):
+    """Sisa Saldo berjalan per grup ``by`` dalam urutan Tanggal.
+
+    ``by`` boleh None (seluruh ledger), "Kategori", atau ["Kategori", "Kasir"].
+    Hasilnya Series sejajar dengan index ``df``; urutan baris ``df`` tidak diubah.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode harus salah satu dari {MODES}, bukan {mode!r}")
+    if df.empty:
+        return pd.Series(0.0, index=df.index, name="Sisa Saldo")
+
+    # Urutan Tanggal (stabil, NaT di akhir) → urutan baris dalam grup ikut ini.
+    # Kalau df sudah urut Tanggal (kasus umum di dashboard), lewati sort-nya.
+    if df["Tanggal"].is_monotonic_increasing:
+        pos = np.arange(len(df))
+    else:
+        pos = np.argsort(df["Tanggal"].to_numpy(), kind="stable")
+    # Tipe asli dipertahankan → rupiah int64 tetap eksak
+    umk = df["UMK"].to_numpy()[pos]
+    spj = df["SPJ"].to_numpy()[pos]
+    delta = umk - spj
+
+    codes = kode_grup(df, by)[pos]
+
+    if mode == "umk_awal":
+        pertama = ~pd.Series(codes).duplicated().to_numpy()
+        delta = np.where(pertama, umk, delta)
+
+    sisa = pd.Series(delta).groupby(codes, sort=False).cumsum().to_numpy()
+
+    hasil = np.empty_like(sisa)
+    hasil[pos] = sisa
+    return pd.Series(hasil, index=df.index, name="Sisa Saldo")
+
+
+class BalanceIndex:
+    """Saldo kumulatif per (Kategori, Kasir) yang sudah urut Tanggal.
+
+    Dibangun sekali per versi data; saldo awal untuk tanggal berapa pun
+    cukup dicari dengan binary search, tidak perlu menghitung ulang dari
+    awal ledger.
+    """
+
+    def __init__(self, df):
+        self._grup = {}
+        if df.empty:
+            return
+        for key, g in df.groupby(["Kategori", "Kasir"], sort=False, dropna=False):
+            g = g.sort_values("Tanggal", kind="stable")
+            tgl = g["Tanggal"].to_numpy(dtype="datetime64[ns]")
+            cum = np.cumsum(g["UMK"].to_numpy() - g["SPJ"].to_numpy())
+            self._grup[key] = (tgl, cum)
+
+    def saldo_awal(self, tanggal, kategori=None, kasir=None):
+        """Saldo sebelum ``tanggal`` (transaksi di tanggal itu belum dihitung).
+
+        ``kategori``/``kasir`` None berarti semua.
+        """
+        batas = np.datetime64(pd.Timestamp(tanggal), "ns")
+        total = 0
+        for (kat, ksr), (tgl, cum) in self._grup.items():
+            if kategori is not None and kat != kategori:
+                continue
+            if kasir is not None and ksr != kasir:
+                continue
+            i = np.searchsorted(tgl, batas, side="left")
+            if i:
+                total += cum[i - 1]
+        return total
+
+
+# Kolom teks yang disimpan sebagai category (teks unik cukup disimpan sekali)
+KOLOM_KODE = ("Kategori", "Kasir", "Uraian", "Keterangan")
+
+
+def _sebagai_kode(s):
+    kat = s.astype("category")
+    if "" in kat.cat.categories:
+        # Sel kosong di sheet = tidak ada nilai
+        kat = kat.cat.remove_categories([""])
+    return kat
+
+
+class CompactLedger:
+    """Ledger kanonik yang ringkas, satu salinan per versi data.
+
+    Kategori/Kasir/Uraian/Keterangan disimpan sebagai kode category, UMK/SPJ
+    int64 rupiah, plus kolom Tahun int16 yang sudah dihitung. Objek ini dibagi
+    read-only ke semua sesi; filter menghasilkan array posisi baris, dan
+    DataFrame baru hanya dibuat untuk baris yang benar-benar dipakai.
+    """
+
+    def __init__(self, df):
+        n = len(df)
+        tanggal = (df["Tanggal"].to_numpy(dtype="datetime64[ns]") if n
+                   else np.array([], dtype="datetime64[ns]"))
+        kolom = {
+            "Tanggal": tanggal,
+            "Tahun": pd.DatetimeIndex(tanggal).year.to_numpy().astype(np.int16),
+        }
+        for k in KOLOM_KODE:
+            kolom[k] = _sebagai_kode(df[k] if k in df.columns else pd.Series([""] * n, dtype=str))
+        for k in ("UMK", "SPJ"):
+            kolom[k] = df[k].to_numpy(dtype=np.int64) if k in df.columns else np.zeros(n, np.int64)
+        self._df = pd.DataFrame(
+            {k: (v.array if isinstance(v, pd.Series) else v) for k, v in kolom.items()}
+        )
+
+        # Array kolom untuk filter/agregat cepat (tidak boleh diubah)
+        self.tahun = self._df["Tahun"].to_numpy()
+        self.umk = self._df["UMK"].to_numpy()
+        self.spj = self._df["SPJ"].to_numpy()
+        self._kode = {k: self._df[k].cat.codes.to_numpy() for k in ("Kategori", "Kasir")}
+        for arr in (self.tahun, self.umk, self.spj, *self._kode.values()):
+            arr.flags.writeable = False
+        self._bangun_indeks()
+        self._bangun_kubus()
+
+    def _bangun_indeks(self):
+        # Indeks filter, sekali per versi data:
+        #   _indeks: (tahun, kode kategori, kode kasir) → posisi baris (urut input)
+        #   _opsi  : (kolom, tahun|None, kategori|None) → pilihan selectbox terurut
+        kat, ksr = self._kode["Kategori"], self._kode["Kasir"]
+        urut = np.lexsort((ksr, kat, self.tahun))   # stabil → posisi dalam grup tetap naik
+        kunci = np.stack([self.tahun[urut], kat[urut], ksr[urut]], axis=1)
+        batas = np.flatnonzero((kunci[1:] != kunci[:-1]).any(axis=1)) + 1
+        awal = np.r_[0, batas] if len(urut) else np.array([], dtype=np.intp)
+        akhir = np.r_[batas, len(urut)]
+
+        self._indeks = {}
+        for i, j in zip(awal, akhir):
+            pos = urut[i:j]
+            pos.flags.writeable = False
+            self._indeks[tuple(int(x) for x in kunci[i])] = pos
+
+        opsi = {}
+        for t, k, s in self._indeks:
+            for tt in (t, None):
+                for kk in (k, None):
+                    if kk is not None and kk < 0:
+                        continue
+                    for kolom, nilai in (("Tahun", t), ("Kategori", k), ("Kasir", s)):
+                        if nilai >= 0:
+                            opsi.setdefault((kolom, tt, kk), set()).add(nilai)
+        nama = {k: self._df[k].cat.categories for k in ("Kategori", "Kasir")}
+        self._opsi = {
+            key: sorted(nilai) if key[0] == "Tahun" else sorted(nama[key[0]][list(nilai)].tolist())
+            for key, nilai in opsi.items()
+        }
+
+    def _bangun_kubus(self):
+        # Kubus rollup, sekali per versi data: jumlah UMK/SPJ + banyak transaksi per
+        #   (Tahun, Bulan, Kategori, Kasir)  → statistik & grafik per kategori/bulan
+        #   (Tahun, Kategori, Kasir, Uraian) → grafik per uraian
+        # Dashboard cukup meng-agregat ulang baris kubus (sebanyak grup, bukan transaksi).
+        kode = {
+            "Tahun": self.tahun,
+            "Bulan": self._df["Tanggal"].dt.month.to_numpy().astype(np.int8),
+            **{k: self._df[k].cat.codes.to_numpy() for k in ("Kategori", "Kasir", "Uraian")},
+        }
+
+        def kubus(dims):
+            g = pd.DataFrame({**{d: kode[d] for d in dims}, "UMK": self.umk, "SPJ": self.spj})
+            hasil = g.groupby(list(dims)).agg(
+                UMK=("UMK", "sum"), SPJ=("SPJ", "sum"), Transaksi=("UMK", "size")
+            ).reset_index()
+            for d in dims:
+                if d in KOLOM_KODE:
+                    # Kode -1 (sel kosong) → NA
+                    hasil[d] = pd.Categorical.from_codes(hasil[d], dtype=self._df[d].dtype)
+            return hasil
+
+        self._kubus = kubus(("Tahun", "Bulan", "Kategori", "Kasir"))
+        self._kubus_uraian = kubus(("Tahun", "Kategori", "Kasir", "Uraian"))
+
+    def __len__(self):
+        return len(self._df)
+
+    def _kode_nilai(self, kolom, nilai):
+        try:
+            return self._df[kolom].cat.categories.get_loc(nilai)
+        except KeyError:
+            return -2      # tidak ada di ledger → tidak cocok dengan grup mana pun
+
+    def select(self, tahun=None, kategori=None, kasir=None):
+        """Posisi baris (array int, urut input) yang cocok dengan filter; None = semua.
+
+        Gabungan posisi grup yang sudah dihitung di indeks: biayanya sebanding
+        jumlah grup + jumlah baris hasil, bukan ukuran ledger.
+        """
+        if tahun is None and kategori is None and kasir is None:
+            return np.arange(len(self))
+        cari = (
+            None if tahun is None else int(tahun),
+            None if kategori is None else self._kode_nilai("Kategori", kategori),
+            None if kasir is None else self._kode_nilai("Kasir", kasir),
+        )
+        if None not in cari:
+            return self._indeks.get(cari, np.array([], dtype=np.intp))
+        bagian = [
+            pos for key, pos in self._indeks.items()
+            if all(c is None or c == k for c, k in zip(cari, key))
+        ]
+        if not bagian:
+            return np.array([], dtype=np.intp)
+        return bagian[0] if len(bagian) == 1 else np.sort(np.concatenate(bagian))
+
+    def distinct(self, kolom, tahun=None, kategori=None):
+        """Pilihan terurut "Tahun"/"Kategori"/"Kasir" untuk filter di atasnya (None = semua)."""
+        t = None if tahun is None else int(tahun)
+        k = None if kategori is None else self._kode_nilai("Kategori", kategori)
+        return list(self._opsi.get((kolom, t, k), []))
+
+    def _potong_kubus(self, kubus, tahun=None, kategori=None, kasir=None):
+        mask = np.ones(len(kubus), dtype=bool)
+        if tahun is not None:
+            mask &= kubus["Tahun"].to_numpy() == int(tahun)
+        if kategori is not None:
+            mask &= (kubus["Kategori"] == kategori).to_numpy()
+        if kasir is not None:
+            mask &= (kubus["Kasir"] == kasir).to_numpy()
+        return kubus[mask]
+
+    def rollup(self, by, tahun=None, kategori=None, kasir=None):
+        """Jumlah UMK, SPJ, dan Transaksi per kolom ``by`` (dari kubus, bukan baris ledger).
+
+        ``by`` boleh kombinasi "Tahun", "Bulan", "Kategori", "Kasir", atau "Uraian"
+        (Uraian tidak bisa digabung dengan Bulan). Grup kosong/NA tidak ikut, sama
+        seperti groupby pandas.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        if "Uraian" in by and "Bulan" in by:
+            raise ValueError("rollup per Uraian tidak tersedia per Bulan")
+        kubus = self._kubus_uraian if "Uraian" in by else self._kubus
+        potong = self._potong_kubus(kubus, tahun, kategori, kasir)
+        return potong.groupby(by, observed=True)[["UMK", "SPJ", "Transaksi"]].sum().reset_index()
+
+    def totals(self, tahun=None, kategori=None, kasir=None):
+        """Tuple (total UMK, total SPJ) sesuai filter, dari kubus."""
+        potong = self._potong_kubus(self._kubus, tahun, kategori, kasir)
+        return int(potong["UMK"].sum()), int(potong["SPJ"].sum())
+
+    @cached_property
+    def status_umk(self):
+        """Status pelunasan UMK (hitung_tenggat) seluruh ledger ini, index = posisi baris.
+
+        Dihitung sekali saat pertama dipakai dan ikut objek ini, jadi selalu
+        sejajar dengan baris ledger yang sama (ambil per filter dengan
+        ``status_umk.iloc[ledger.select(...)]``).
+        """
+        # Impor di sini: kasva.tenggat sendiri mengimpor kasva.ledger
+        from kasva.tenggat import hitung_tenggat
+        return hitung_tenggat(self._df)
+
+    def frame(self, pos=None):
+        """DataFrame milik pemanggil: baris ``pos`` saja, atau salinan dangkal semuanya.
+
+        Copy-on-Write pandas menjamin perubahan di hasil ini tidak menyentuh ledger bersama.
+        """
+        if pos is None:
+            return self._df.copy(deep=False)
+        return self._df.take(pos)
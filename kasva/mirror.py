@@ -0,0 +1,62 @@
+import json
+import logging
+import os
+
+import pandas as pd
+
+# ------------------------
+# MIRROR LOKAL (Parquet)
+# Snapshot terakhir sheet Data, Data Kasir, dan Tenggat Waktu disimpan di disk.
+# Setelah restart/cold start, dashboard langsung tampil dari snapshot ini
+# sementara sinkron ke Google Sheets jalan di background.
+# KASVA_OFFLINE=1 → tidak pernah ke network, hanya baca mirror (untuk test/offline).
+# ------------------------
+
+MIRROR_DIR = os.environ.get("KASVA_MIRROR_DIR", ".kasva_mirror")
+OFFLINE = os.environ.get("KASVA_OFFLINE", "") == "1"
+
+log = logging.getLogger(__name__)
+
+
+def _path(nama):
+    return os.path.join(MIRROR_DIR, nama)
+
+
+def _tulis(df, nama):
+    # Tulis ke file sementara dulu lalu rename → snapshot tidak pernah setengah jadi
+    tmp = _path(nama + ".tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, _path(nama))
+
+
+def simpan(data, kasir, tenggat, meta):
+    """Simpan snapshot + watermark sinkron. Gagal simpan tidak boleh menjatuhkan app."""
+    try:
+        os.makedirs(MIRROR_DIR, exist_ok=True)
+        _tulis(data, "data.parquet")
+        _tulis(pd.DataFrame({"Kasir": kasir}), "kasir.parquet")
+        _tulis(tenggat, "tenggat.parquet")
+        tmp = _path("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, _path("meta.json"))
+    except Exception:
+        log.warning("Gagal menyimpan mirror lokal di %s", MIRROR_DIR, exc_info=True)
+
+
+def muat():
+    """Snapshot terakhir sebagai dict (data, kasir, tenggat, meta), atau None kalau belum ada."""
+    try:
+        with open(_path("meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        return {
+            "data": pd.read_parquet(_path("data.parquet")),
+            "kasir": pd.read_parquet(_path("kasir.parquet"))["Kasir"].tolist(),
+            "tenggat": pd.read_parquet(_path("tenggat.parquet")),
+            "meta": meta,
+        }
+    except FileNotFoundError:
+        return None
+    except Exception:
+        log.warning("Mirror lokal di %s tidak bisa dibaca", MIRROR_DIR, exc_info=True)
+        return None
@@ -0,0 +1,283 @@
+import contextvars
+import cProfile
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# ------------------------
+# PANTAU KINERJA PER RERUN
+# Tiap rerun mencatat durasi per tahap (``with pantau.tahap("..."):``) dan
+# jumlah panggilan + byte Google Sheets API (dihitung di hook HTTP, lihat
+# kasva/sheets.py). Di akhir rerun ditulis satu baris log JSON (logger
+# "kasva.pantau") untuk menghitung p95 dan pemakaian kuota di luar app;
+# admin (KASVA_ADMIN) juga melihat panel debug di bawah halaman, termasuk
+# profiler sekali jalan (lihat bagian PROFIL di bawah).
+# ------------------------
+
+# Username (lihat USERS di app) yang boleh melihat panel debug, pisahkan dengan koma
+ADMIN = {u.strip() for u in os.environ.get("KASVA_ADMIN", "").split(",") if u.strip()}
+
+# KASVA_PANTAU_LOG=0 → tidak menulis baris log per rerun
+LOG_RERUN = os.environ.get("KASVA_PANTAU_LOG", "1") == "1"
+
+# Jumlah rerun terakhir (per proses) yang disimpan untuk p50/p95 di panel
+RIWAYAT = 500
+
+# Profiler sekali jalan: jumlah baris alokasi / fungsi yang ditampilkan di panel
+TOP_ALOKASI = 15
+TOP_FUNGSI = 30
+
+log = logging.getLogger(__name__)
+if LOG_RERUN and not log.handlers:
+    # Satu baris JSON per rerun ke stderr, terpisah dari log Streamlit
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+
+@dataclass
+class Rekam:
+    halaman: str
+    mulai: float = field(default_factory=time.perf_counter)
+    tahap: dict = field(default_factory=dict)      # nama tahap → ms (dijumlah kalau berulang)
+    api_panggilan: int = 0
+    api_byte_masuk: int = 0                        # body respons
+    api_byte_keluar: int = 0                       # body request (mis. append)
+    selesai: bool = False
+    profil: cProfile.Profile = None                # aktif hanya di rerun yang diprofil
+
+
+# Rekam rerun yang sedang jalan di thread ini (hook HTTP sheets ikut mencatat ke sini)
+_rekam = contextvars.ContextVar("kasva_rekam", default=None)
+
+
+@st.cache_resource
+def _proses():
+    # Satu objek per proses server: total API (semua sesi + thread background)
+    # dan riwayat rerun untuk persentil
+    return {"lock": threading.Lock(), "api_panggilan": 0, "api_byte": 0,
+            "api_waktu": deque(), "sejak": time.time(),
+            "riwayat": deque(maxlen=RIWAYAT)}
+
+
+def catat_api(byte_masuk, byte_keluar=0):
+    """Catat satu panggilan HTTP ke Google API (dipanggil dari hook di kasva.sheets)."""
+    proses = _proses()
+    sekarang = time.time()
+    with proses["lock"]:
+        proses["api_panggilan"] += 1
+        proses["api_byte"] += byte_masuk + byte_keluar
+        proses["api_waktu"].append(sekarang)
+        while proses["api_waktu"] and proses["api_waktu"][0] < sekarang - 60:
+            proses["api_waktu"].popleft()
+    rekam = _rekam.get()
+    if rekam is not None:
+        rekam.api_panggilan += 1
+        rekam.api_byte_masuk += byte_masuk
+        rekam.api_byte_keluar += byte_keluar
+
+
+def _sesi():
+    ctx = get_script_run_ctx()
+    return ctx.session_id[:8] if ctx else None
+
+
+def _ringkas(rekam, status):
+    return {
+        "event": "kasva_rerun",
+        "waktu": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sesi": _sesi(),
+        "user": st.session_state.get("user") if st.session_state.get("logged_in") else None,
+        "halaman": rekam.halaman,
+        "status": status,
+        "total_ms": round((time.perf_counter() - rekam.mulai) * 1000, 1),
+        "tahap_ms": {k: round(v, 1) for k, v in rekam.tahap.items()},
+        "api_panggilan": rekam.api_panggilan,
+        "api_byte_masuk": rekam.api_byte_masuk,
+        "api_byte_keluar": rekam.api_byte_keluar,
+    }
+
+
+def _tutup(rekam, status):
+    rekam.selesai = True
+    if rekam.profil is not None:
+        _simpan_profil(rekam)
+    hasil = _ringkas(rekam, status)
+    proses = _proses()
+    with proses["lock"]:
+        proses["riwayat"].append(hasil)
+    if LOG_RERUN:
+        log.info(json.dumps(hasil, ensure_ascii=False))
+    return hasil
+
+
+def mulai(halaman):
+    """Awal rerun. Rerun sebelumnya yang terputus (st.rerun/st.stop) ditutup dulu."""
+    lama = st.session_state.get("_pantau_rekam")
+    if lama is not None and not lama.selesai:
+        _tutup(lama, "terputus")
+    rekam = Rekam(halaman)
+    st.session_state["_pantau_rekam"] = rekam
+    _rekam.set(rekam)
+    if is_admin() and _minta_profil():
+        _mulai_profil(rekam)
+    return rekam
+
+
+@contextmanager
+def tahap(nama):
+    """Ukur durasi blok sebagai tahap ``nama`` di rerun yang sedang jalan."""
+    awal = time.perf_counter()
+    try:
+        yield
+    finally:
+        rekam = _rekam.get()
+        if rekam is not None:
+            rekam.tahap[nama] = rekam.tahap.get(nama, 0.0) + (time.perf_counter() - awal) * 1000
+
+
+def selesai():
+    """Akhir rerun: tulis log JSON, return ringkasannya (dict), atau None kalau belum mulai()."""
+    rekam = _rekam.get()
+    if rekam is None or rekam.selesai:
+        return None
+    return _tutup(rekam, "selesai")
+
+
+def is_admin():
+    return bool(st.session_state.get("logged_in")) and st.session_state.get("user") in ADMIN
+
+
+# ------------------------
+# PROFIL SEKALI JALAN (cProfile + tracemalloc)
+# Admin menandai rerun berikutnya (tombol di panel atau ?profil=1 di URL);
+# rerun itu dibungkus cProfile + tracemalloc, hasilnya (.prof + alokasi
+# terbesar) disimpan di session dan ditampilkan di panel. Tanpa redeploy
+# dan tanpa debugger; rerun lain tidak kena overhead apa pun.
+# ------------------------
+
+
+def _minta_profil():
+    # Sekali pakai: flag session / query param langsung dihapus
+    minta = st.session_state.pop("_pantau_profil", False)
+    if st.query_params.get("profil") == "1":
+        del st.query_params["profil"]
+        minta = True
+    return minta
+
+
+def _mulai_profil(rekam):
+    if tracemalloc.is_tracing():
+        # Sesi lain sedang diprofil (tracemalloc global per proses) → lewati
+        return
+    profil = cProfile.Profile()
+    try:
+        profil.enable()
+    except ValueError:
+        # Python 3.12+: hanya satu profiler aktif per proses
+        log.warning("Profiler lain sedang aktif, rerun ini tidak diprofil")
+        return
+    tracemalloc.start()
+    rekam.profil = profil
+
+
+def _simpan_profil(rekam):
+    rekam.profil.disable()
+    snapshot = tracemalloc.take_snapshot()
+    _, puncak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    teks = io.StringIO()
+    stats = pstats.Stats(rekam.profil, stream=teks)
+    # Format marshal = file .prof standar (pstats, snakeviz, flameprof)
+    prof = marshal.dumps(stats.stats)
+    stats.sort_stats("cumulative").print_stats(TOP_FUNGSI)
+
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    alokasi = pd.DataFrame(
+        [(str(stat.traceback[0]), round(stat.size / 1024, 1), stat.count)
+         for stat in snapshot.statistics("lineno")[:TOP_ALOKASI]],
+        columns=["Lokasi", "KB", "Blok"],
+    )
+    st.session_state["_pantau_hasil_profil"] = {
+        "waktu": time.strftime("%Y%m%d_%H%M%S"),
+        "halaman": rekam.halaman,
+        "prof": prof,
+        "fungsi": teks.getvalue(),
+        "alokasi": alokasi,
+        "puncak_kb": round(puncak / 1024),
+    }
+    rekam.profil = None
+
+
+def _panel_profil():
+    if st.button("🔬 Profil rerun berikutnya", help="cProfile + tracemalloc, sekali jalan"):
+        st.session_state["_pantau_profil"] = True
+        st.rerun()
+
+    hasil = st.session_state.get("_pantau_hasil_profil")
+    if hasil is None:
+        return
+    st.caption(f"Profil terakhir: halaman {hasil['halaman']}, {hasil['waktu']}, "
+               f"puncak memori {hasil['puncak_kb']:,} KB")
+    st.download_button(
+        "⬇️ Download .prof", hasil["prof"],
+        file_name=f"kasva_{hasil['halaman']}_{hasil['waktu']}.prof",
+        mime="application/octet-stream",
+        help="Buka dengan `python -m pstats`, snakeviz, atau flameprof (flamegraph)",
+    )
+    st.markdown("**Alokasi terbesar** (memori yang masih terpakai di akhir rerun)")
+    st.dataframe(hasil["alokasi"], hide_index=True, use_container_width=True)
+    st.markdown(f"**{TOP_FUNGSI} fungsi teratas** (cumulative)")
+    st.code(hasil["fungsi"], language=None)
+
+
+def panel(hasil):
+    """Panel debug (hanya untuk admin): tahap rerun ini, p50/p95 per halaman, kuota API."""
+    if hasil is None:
+        return
+    proses = _proses()
+    with proses["lock"]:
+        riwayat = pd.DataFrame(list(proses["riwayat"]))
+        total_api, total_byte = proses["api_panggilan"], proses["api_byte"]
+        per_menit = len(proses["api_waktu"])
+
+    with st.expander(f"🛠️ Debug kinerja — rerun ini {hasil['total_ms']:,.0f} ms"):
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Sheets API (rerun ini)", hasil["api_panggilan"],
+                  help=f"{hasil['api_byte_masuk'] / 1024:,.0f} KB masuk, "
+                       f"{hasil['api_byte_keluar'] / 1024:,.0f} KB keluar")
+        c2.metric("Sheets API 60 detik terakhir", per_menit)
+        c3.metric("Sheets API sejak start", total_api,
+                  help=f"{total_byte / 1024 / 1024:,.1f} MB, sejak "
+                       f"{time.strftime('%d-%m-%Y %H:%M', time.localtime(proses['sejak']))}")
+
+        tahap_df = pd.DataFrame(
+            sorted(hasil["tahap_ms"].items(), key=lambda kv: -kv[1]), columns=["Tahap", "ms"]
+        )
+        st.dataframe(tahap_df, hide_index=True, use_container_width=True)
+
+        if not riwayat.empty:
+            st.caption(f"{len(riwayat)} rerun terakhir di proses ini")
+            ringkas = riwayat.groupby("halaman")["total_ms"].describe(percentiles=[0.5, 0.95])
+            st.dataframe(ringkas[["count", "50%", "95%", "max"]].round(1), use_container_width=True)
+
+        _panel_profil()
@@ -0,0 +1,131 @@
+import datetime
+import re
+
+import numpy as np
+import pandas as pd
+
+# ------------------------
+# PARSER NILAI SHEET
+# Satu aturan untuk semua app. Format Rupiah Indonesia:
+#   "Rp1.250.000"   → 1250000   (titik = pemisah ribuan)
+#   "Rp1.250.000,75"→ 1250001   (koma = desimal, dibulatkan ke rupiah terdekat, ,5 ke atas)
+#   "Rp1,250,000"   → 1250000   (koma + tepat tiga digit = pemisah ribuan juga)
+# Hasil selalu int64 rupiah (bukan float) supaya total tidak bergeser. Sel
+# terisi yang tetap tidak terbaca dihitung 0 tapi ditandai (parse_rupiah_cek).
+# ------------------------
+
+_JENIS_ANGKA = {"integer", "floating", "mixed-integer-float", "decimal", "empty"}
+
+# Sampel untuk menebak apakah nilai banyak berulang (→ parse nilai unik saja)
+_SAMPEL = 10_000
+
+
+# Dibuang dalam satu lewat: "Rp", spasi, dan pemisah ribuan (titik/koma yang
+# diikuti tepat tiga digit). Titik/koma yang tersisa = pemisah desimal.
+_BUANG = re.compile(r"Rp|\s|[.,](?=\d{3}(?!\d))", re.IGNORECASE)
+
+# Teks yang berarti nol (format akuntansi menampilkan 0 sebagai "Rp -")
+_NOL = {"": "0", "-": "0"}
+
+
+def _teks_ke_angka(s):
+    # NaN = sel terisi yang tidak terbaca
+    t = s.fillna("").astype(str).str.replace(_BUANG, "", regex=True).str.replace(",", ".", regex=False)
+    t = t.replace(_NOL)
+    try:
+        # Jalur cepat: semua sel bersih → cast langsung
+        return t.astype(float)
+    except (ValueError, TypeError):
+        return pd.to_numeric(t, errors="coerce")
+
+
+def _teks_unik_ke_angka(s):
+    # Nilai uang di ledger banyak berulang (sel kosong, nominal bulat),
+    # jadi cukup parse tiap nilai unik sekali lalu sebar lagi lewat kode.
+    kode, unik = pd.factorize(s)
+    nilai = _teks_ke_angka(pd.Series(unik, dtype=object)).to_numpy(dtype=float)
+    hasil = np.zeros(len(s))
+    ada = kode >= 0
+    hasil[ada] = nilai[kode[ada]]
+    return pd.Series(hasil, index=s.index)
+
+
+def _parse_teks(s):
+    sampel = s.iloc[:_SAMPEL]
+    if len(s) > _SAMPEL and sampel.nunique() < len(sampel) // 2:
+        return _teks_unik_ke_angka(s)
+    return _teks_ke_angka(s)
+
+
+def parse_rupiah_cek(s):
+    """Seperti parse_rupiah, plus Series bool sel terisi yang tidak terbaca (dihitung 0)."""
+    if pd.api.types.is_numeric_dtype(s):
+        angka = s.astype(float).fillna(0)
+    else:
+        jenis = pd.api.types.infer_dtype(s, skipna=True)
+        if jenis in _JENIS_ANGKA:
+            angka = pd.to_numeric(s, errors="coerce").fillna(0)
+        elif jenis == "string":
+            angka = _parse_teks(s)
+        else:
+            # Campuran angka dan teks: hanya sel teks yang lewat jalur string
+            is_teks = s.map(lambda v: isinstance(v, str)).astype(bool)
+            angka = pd.to_numeric(s.where(~is_teks), errors="coerce").fillna(0)
+            angka[is_teks] = _parse_teks(s[is_teks])
+    gagal = angka.isna()
+    angka = angka.fillna(0)
+    # Setengah dibulatkan menjauhi nol (round() pandas = ke genap: 2,5 → 2)
+    bulat = np.sign(angka) * np.floor(angka.abs() + 0.5)
+    return bulat.astype("int64"), gagal
+
+
+def parse_rupiah(s):
+    """Series nilai UMK/SPJ (teks "Rp..." atau angka) → Series int64 rupiah.
+
+    Sel kosong/tidak terbaca dianggap 0. Jalur cepat: kalau sel sudah berupa
+    angka (mis. render UNFORMATTED_VALUE), tidak ada operasi string sama sekali.
+    """
+    return parse_rupiah_cek(s)[0]
+
+
+# Format tanggal yang dipakai di sheet: tambah_data menulis %d-%m-%Y,
+# form_tambah.py menulis %d/%m/%Y, sisanya dari input manual.
+FORMAT_TANGGAL = ("%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y", "%Y-%m-%d", "%Y/%m/%d")
+
+
+def parse_tanggal(s):
+    """Series tanggal (teks atau datetime) → Series datetime64[ns].
+
+    Tiap string unik hanya diparse sekali (factorize sebagai memo), dan tiap
+    format di FORMAT_TANGGAL dicoba vectorized pada nilai yang belum terbaca.
+    Sisanya jatuh ke tebakan dayfirst. Kosong/tidak terbaca → NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.astype("datetime64[ns]")
+
+    kode, unik = pd.factorize(s)
+    unik = pd.Series(unik, dtype=object)
+    hasil = pd.Series(pd.NaT, index=unik.index, dtype="datetime64[ns]")
+
+    is_tgl = unik.map(lambda v: isinstance(v, datetime.date)).astype(bool)
+    if is_tgl.any():
+        # Sel yang sudah berupa date/datetime/Timestamp
+        hasil[is_tgl] = pd.to_datetime(unik[is_tgl], errors="coerce")
+
+    teks = unik[~is_tgl].astype(str).str.strip()
+    sisa = teks[teks != ""]
+    for fmt in FORMAT_TANGGAL:
+        if sisa.empty:
+            break
+        p = pd.to_datetime(sisa, format=fmt, errors="coerce")
+        ok = p.notna().to_numpy()
+        hasil[sisa.index[ok]] = p[ok]
+        sisa = sisa[~ok]
+    if not sisa.empty:
+        hasil[sisa.index] = pd.to_datetime(sisa, dayfirst=True, format="mixed", errors="coerce")
+
+    nilai = hasil.to_numpy(dtype="datetime64[ns]")
+    out = np.full(len(s), np.datetime64("NaT"), dtype="datetime64[ns]")
+    ada = kode >= 0
+    out[ada] = nilai[kode[ada]]
+    return pd.Series(out, index=s.index, name=s.name)
@@ -0,0 +1,115 @@
+import os
+import re
+
+import gspread
+import streamlit as st
+from google.oauth2.service_account import Credentials
+
+from kasva import pantau
+
+# ------------------------
+# KONEKSI GOOGLE SHEETS
+# Auth + buka spreadsheet cukup sekali per proses server, lalu handle
+# worksheet dipakai ulang oleh semua sesi dan semua rerun.
+# ------------------------
+
+SCOPE = ["https://www.googleapis.com/auth/spreadsheets",
+         "https://www.googleapis.com/auth/drive"]
+
+# Spreadsheet "KASVA 1.0 - Aplikasi Cash Flow BKPSDM" (dibuka by key, bukan cari judul)
+SHEET_ID = os.environ.get("KASVA_SHEET_ID", "1JN7XPhIMVwcd982JcwzdGQoYu9MJFghofb0ImmZUUYc")
+
+# File kredensial untuk jalan lokal (di Cloud pakai st.secrets)
+CREDENTIALS_FILE = os.environ.get(
+    "KASVA_CREDENTIALS",
+    r"C:/Users/MyBook Hype AMD/Videos/Dashboard Arus Kas/proven-mystery-471102-k6-0d7bdda0bcd4.json",
+)
+
+
+@st.cache_resource(show_spinner=False)
+def get_client(credentials_file=None):
+    """Client gspread; ``credentials_file`` (opsional) menggantikan CREDENTIALS_FILE untuk jalan lokal."""
+    try:
+        # --- Cloud (Streamlit Secrets) ---
+        creds = Credentials.from_service_account_info(
+            st.secrets["gcp_service_account"], scopes=SCOPE
+        )
+    except Exception:
+        # --- Lokal (File JSON) ---
+        creds = Credentials.from_service_account_file(credentials_file or CREDENTIALS_FILE,
+                                                      scopes=SCOPE)
+    # gspread menyimpan requests.Session di client → koneksi HTTP dipakai ulang
+    client = gspread.authorize(creds)
+    client.http_client.session.hooks["response"].append(_catat_respons)
+    return client
+
+
+def _catat_respons(resp, *args, **kwargs):
+    # Hook requests: tiap panggilan HTTP (baca, append, metadata) dihitung untuk
+    # pantau kuota dan byte per rerun (lihat kasva/pantau.py)
+    body = resp.request.body or b""
+    pantau.catat_api(len(resp.content), len(body))
+
+
+@st.cache_resource(show_spinner=False)
+def get_spreadsheet(credentials_file=None):
+    return get_client(credentials_file).open_by_key(SHEET_ID)
+
+
+@st.cache_resource(show_spinner=False)
+def worksheet(nama, credentials_file=None):
+    """Handle worksheet by nama ("Data", "Data Kasir", "Tenggat Waktu")."""
+    return get_spreadsheet(credentials_file).worksheet(nama)
+
+
+def batch_values(ranges):
+    """Ambil beberapa range sekaligus dalam satu panggilan values.batchGet.
+
+    Hasilnya list grid (list of list) sesuai urutan ``ranges``.
+    """
+    resp = get_spreadsheet().values_batch_get(ranges)
+    return [vr.get("values", []) for vr in resp.get("valueRanges", [])]
+
+
+def append_rows(nama, rows, table_range="B1:H1", credentials_file=None):
+    """Tambah baris lewat values.append (server cari baris kosong sendiri).
+
+    Tidak perlu download sheet untuk menghitung baris berikutnya, dan aman kalau
+    dua kasir menyimpan bersamaan. ``table_range`` dimulai di kolom B supaya
+    kolom A ("No", formula) tidak ditimpa. Return list nomor baris yang ditulis.
+    """
+    resp = worksheet(nama, credentials_file).append_rows(rows, table_range=table_range)
+    # updatedRange contoh: "Data!B52:H53"
+    rentang = resp["updates"]["updatedRange"].split("!")[-1]
+    awal = int(re.match(r"[A-Z]+(\d+)", rentang).group(1))
+    return list(range(awal, awal + len(rows)))
+
+
+def append_row(nama, values, table_range="B1:H1", credentials_file=None):
+    """Satu baris saja; return nomor baris yang ditulis."""
+    return append_rows(nama, [values], table_range, credentials_file)[0]
+
+
+def update_cell(nama, sel, nilai):
+    """Tulis satu sel (A1, mis. "I1") di worksheet ``nama``."""
+    worksheet(nama).update_acell(sel, nilai)
+
+
+def ditolak(error):
+    """True kalau ``error`` penolakan API yang pasti terjadi sebelum apa pun ditulis.
+
+    4xx (429 kuota, 400, 403, ...) berarti request ditolak utuh. Timeout (408),
+    5xx, dan error jaringan ambigu: append bisa saja sudah diterapkan.
+    """
+    if isinstance(error, gspread.exceptions.APIError):
+        kode = error.response.status_code
+        return 400 <= kode < 500 and kode != 408
+    return False
+
+
+def ditolak_permanen(error):
+    """True kalau ``error`` penolakan yang tidak akan berubah walau dikirim ulang.
+
+    Sama seperti ``ditolak`` tapi tanpa 429 (kuota habis = sementara).
+    """
+    return ditolak(error) and error.response.status_code != 429
@@ -0,0 +1,442 @@
+import logging
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from gspread.utils import a1_to_rowcol
+
+from kasva import data as kasva_data
+from kasva import mirror, sheets
+from kasva.antrian import WriteQueue
+from kasva.sync import TAIL_ROWS
+from kasva.tenggat import hitung_tenggat
+
+# ------------------------
+# BACKEND PENYIMPANAN
+# Dashboard cukup bicara ke antarmuka StorageBackend; implementasinya bisa
+# Google Sheets (default) atau SQLite. Pilih lewat env KASVA_BACKEND=sqlite.
+# Filter Tahun/Kategori/Kasir dan total UMK/SPJ didorong ke backend, jadi
+# di SQLite semuanya jadi query ber-index, bukan pandas di atas seluruh ledger.
+# Database SQLite diisi dari Google Sheets/mirror dengan ``python -m kasva.impor``.
+# ------------------------
+
+BACKEND = os.environ.get("KASVA_BACKEND", "gsheets")
+SQLITE_PATH = os.environ.get("KASVA_SQLITE", "kasva.db")
+
+# Kolom ledger yang dipakai dashboard (urutan = kolom B-H sheet Data)
+LEDGER_COLS = ["Tanggal", "Kategori", "Kasir", "Uraian", "UMK", "SPJ", "Keterangan"]
+
+# Kolom sheet Data tempat kunci antrian ditulis (di luar A-H yang dibaca dashboard).
+# Kolom ini dicadangkan untuk antrian: header-nya HEADER_KUNCI (lihat README).
+KOLOM_KUNCI = os.environ.get("KASVA_KOLOM_KUNCI", "I")
+HEADER_KUNCI = "Kunci Antrian"
+# Sel kosong antara kolom H dan kolom kunci (0 untuk kolom I)
+_CELAH_KUNCI = a1_to_rowcol(f"{KOLOM_KUNCI}1")[1] - 2 - len(LEDGER_COLS)
+if _CELAH_KUNCI < 0:
+    raise ValueError(f"KASVA_KOLOM_KUNCI harus di kanan kolom H, bukan {KOLOM_KUNCI!r}")
+
+log = logging.getLogger(__name__)
+
+
+class StorageBackend(ABC):
+    """Antarmuka penyimpanan ledger KASVA.
+
+    Argumen filter ``tahun``/``kategori``/``kasir`` bernilai None berarti "Semua".
+    """
+
+    @abstractmethod
+    def data_version(self):
+        """Penanda versi data (berubah setiap ledger berubah), untuk kunci cache turunan."""
+
+    @abstractmethod
+    def load_ledger(self, tahun=None, kategori=None, kasir=None):
+        """DataFrame ledger (kolom LEDGER_COLS) sesuai filter, urut seperti input."""
+
+    def load_ledger_tenggat(self, tahun=None, kategori=None, kasir=None):
+        """load_ledger + kolom "Sisa UMK", "Tanggal Lunas", "Tenggat Waktu".
+
+        Pelunasan FIFO dihitung atas seluruh ledger dulu baru difilter: SPJ awal
+        tahun boleh melunasi UMK tahun sebelumnya.
+        """
+        semua, status = self._ledger_status()
+        pilih = np.ones(len(semua), dtype=bool)
+        if tahun is not None:
+            pilih &= (semua["Tanggal"].dt.year == int(tahun)).to_numpy()
+        if kategori is not None:
+            pilih &= (semua["Kategori"] == kategori).to_numpy()
+        if kasir is not None:
+            pilih &= (semua["Kasir"] == kasir).to_numpy()
+        return semua.join(status)[pilih].reset_index(drop=True)
+
+    def _ledger_status(self):
+        # (seluruh ledger, hitung_tenggat-nya); backend boleh meng-cache per data_version
+        semua = self.load_ledger()
+        return semua, hitung_tenggat(semua)
+
+    @abstractmethod
+    def distinct(self, kolom, tahun=None, kategori=None):
+        """Daftar nilai unik terurut untuk "Tahun", "Kategori", atau "Kasir"."""
+
+    @abstractmethod
+    def totals(self, tahun=None, kategori=None, kasir=None):
+        """Tuple (total UMK, total SPJ) sesuai filter."""
+
+    @abstractmethod
+    def opening_balance(self, tanggal, kategori=None, kasir=None):
+        """Saldo (UMK - SPJ) sebelum ``tanggal``; transaksi di tanggal itu belum dihitung."""
+
+    @abstractmethod
+    def rollup(self, by, tahun=None, kategori=None, kasir=None):
+        """DataFrame jumlah UMK, SPJ, dan Transaksi per kolom ``by`` sesuai filter.
+
+        ``by``: "Tahun", "Bulan", "Kategori", "Kasir", "Uraian" (atau list-nya).
+        """
+
+    @abstractmethod
+    def append_transaction(self, tanggal, kategori, kasir, uraian, umk, spj, keterangan=""):
+        """Simpan satu transaksi baru; return nomor baris/id yang ditulis."""
+
+    def submit_transaction(self, tanggal, kategori, kasir, uraian, umk, spj, keterangan=""):
+        """Dipakai tombol "Simpan Data": boleh ditunda (write-behind), default langsung tulis."""
+        return self.append_transaction(tanggal, kategori, kasir, uraian, umk, spj, keterangan)
+
+    def queue_depth(self):
+        """Jumlah transaksi yang masih menunggu dikirim."""
+        return 0
+
+    def invalid_rows(self):
+        """Baris ledger yang tidak ikut dihitung karena Tanggal-nya tidak terbaca."""
+        return pd.DataFrame()
+
+    def invalid_amounts(self):
+        """Baris ledger yang UMK/SPJ-nya tidak terbaca (ikut dihitung sebagai 0)."""
+        return pd.DataFrame()
+
+    def rejected_rows(self):
+        """Transaksi antrian yang ditolak permanen oleh penyimpanan (tidak dikirim ulang)."""
+        return pd.DataFrame()
+
+    @abstractmethod
+    def list_kasir(self):
+        """Nama kasir untuk pilihan di form tambah data."""
+
+    @abstractmethod
+    def load_deadlines(self):
+        """Isi tabel Tenggat Waktu."""
+
+
+class GoogleSheetsBackend(StorageBackend):
+    """Backend default: baca dari cache kasva.data, tulis ke worksheet Data."""
+
+    def __init__(self):
+        # Simpan dari form lewat antrian → submit tidak ikut lambat saat API 429/timeout.
+        # Baris di antrian langsung ditumpuk ke ledger cache (write-through); setelah
+        # terkirim, cache di-invalidate supaya sinkron inkremental mengambil baris aslinya.
+        # Kunci tiap baris ikut ditulis ke kolom I → kirim ulang setelah timeout/5xx
+        # dicek dulu di sheet, tidak dobel.
+        self._awal_cek = None
+        self._kolom_siap = False
+        if not mirror.OFFLINE:
+            try:
+                self._siapkan_kolom_kunci()
+            except Exception:
+                # Dicek lagi sebelum kirim pertama; sampai beres baris tetap di jurnal
+                log.error("Kolom kunci antrian %s belum siap", KOLOM_KUNCI, exc_info=True)
+        self.antrian = WriteQueue(self._kirim, setelah_kirim=kasva_data.invalidate,
+                                  cek_terkirim=self._cek_terkirim, ditolak=sheets.ditolak,
+                                  permanen=sheets.ditolak_permanen)
+        kasva_data.set_overlay(self.antrian.pending)
+
+    def data_version(self):
+        return kasva_data.data_version()
+
+    def load_ledger(self, tahun=None, kategori=None, kasir=None):
+        led = kasva_data.load_compact_ledger()
+        # Filter = array posisi di ledger bersama; yang di-copy hanya baris hasilnya
+        return led.frame(led.select(tahun, kategori, kasir)).reindex(columns=LEDGER_COLS)
+
+    def load_ledger_tenggat(self, tahun=None, kategori=None, kasir=None):
+        # Status pelunasan sudah di-cache per versi data (seluruh ledger);
+        # baris hasil filter cukup diambil per posisi
+        led, status = kasva_data.load_ledger_status()
+        pos = led.select(tahun, kategori, kasir)
+        return led.frame(pos).reindex(columns=LEDGER_COLS).join(status.iloc[pos])
+
+    def distinct(self, kolom, tahun=None, kategori=None):
+        led = kasva_data.load_compact_ledger()
+        return led.distinct(kolom, tahun, kategori)
+
+    def totals(self, tahun=None, kategori=None, kasir=None):
+        return kasva_data.load_compact_ledger().totals(tahun, kategori, kasir)
+
+    def opening_balance(self, tanggal, kategori=None, kasir=None):
+        return int(kasva_data.load_balance_index().saldo_awal(tanggal, kategori, kasir))
+
+    def rollup(self, by, tahun=None, kategori=None, kasir=None):
+        return kasva_data.load_compact_ledger().rollup(by, tahun, kategori, kasir)
+
+    @staticmethod
+    def _sheet_row(tanggal, kategori, kasir, uraian, umk, spj, keterangan):
+        # Simpan tanggal dengan format standar Indonesia DD-MM-YYYY agar sinkron saat load
+        return [tanggal.strftime("%d-%m-%Y"), kategori, kasir, uraian, umk, spj, keterangan]
+
+    def _siapkan_kolom_kunci(self):
+        # Kolom kunci hanya boleh dipakai kalau header-nya HEADER_KUNCI, atau kolomnya
+        # masih kosong sama sekali (lalu header dipasang). Selain itu jangan ditimpa.
+        (grid,) = sheets.batch_values([f"'Data'!{KOLOM_KUNCI}1:{KOLOM_KUNCI}1"])
+        header = grid[0][0] if grid and grid[0] else ""
+        if header != HEADER_KUNCI:
+            (isi,) = sheets.batch_values([f"'Data'!{KOLOM_KUNCI}:{KOLOM_KUNCI}"])
+            if header or any(r and str(r[0]).strip() for r in isi):
+                raise RuntimeError(
+                    f"Kolom {KOLOM_KUNCI} sheet Data sudah berisi data lain; kosongkan kolom itu "
+                    f"atau pilih kolom kosong lewat KASVA_KOLOM_KUNCI"
+                )
+            sheets.update_cell("Data", f"{KOLOM_KUNCI}1", HEADER_KUNCI)
+        self._kolom_siap = True
+
+    def _kirim(self, rows, kunci):
+        # Semua baris tertunda digabung jadi satu panggilan append (B-H + kunci)
+        if not self._kolom_siap:
+            self._siapkan_kolom_kunci()
+        if self._awal_cek is None:
+            # Baris yang mungkin masuk pasti di bawah watermark sinkron saat ini
+            self._awal_cek = max(2, kasva_data.sheet_rows() - TAIL_ROWS)
+        celah = [""] * _CELAH_KUNCI
+        sheets.append_rows("Data", [r + celah + [k] for r, k in zip(rows, kunci)],
+                           table_range=f"B1:{KOLOM_KUNCI}1")
+        self._awal_cek = None
+
+    def _cek_terkirim(self, kunci):
+        # Ekor kolom kunci sejak watermark kirim pertama; setelah restart
+        # (batas tidak diketahui) seluruh kolom
+        awal = self._awal_cek or 2
+        (grid,) = sheets.batch_values([f"'Data'!{KOLOM_KUNCI}{awal}:{KOLOM_KUNCI}"])
+        ada = {r[0] for r in grid if r}
+        return {k for k in kunci if k in ada}
+
+    def append_transaction(self, tanggal, kategori, kasir, uraian, umk, spj, keterangan=""):
+        row = sheets.append_row(
+            "Data", self._sheet_row(tanggal, kategori, kasir, uraian, umk, spj, keterangan)
+        )
+        kasva_data.invalidate()
+        return row
+
+    def submit_transaction(self, tanggal, kategori, kasir, uraian, umk, spj, keterangan=""):
+        id_antrian = self.antrian.put(
+            self._sheet_row(tanggal, kategori, kasir, uraian, umk, spj, keterangan)
+        )
+        # Write-through: ledger, indeks saldo, dan agregat dibangun ulang dari cache lokal
+        kasva_data.touch()
+        return id_antrian
+
+    def queue_depth(self):
+        return self.antrian.depth()
+
+    def invalid_rows(self):
+        return kasva_data.load_tanggal_gagal()
+
+    def invalid_amounts(self):
+        return kasva_data.load_nominal_gagal()
+
+    def rejected_rows(self):
+        gagal = self.antrian.daftar_gagal()
+        df = pd.DataFrame([g["payload"] for g in gagal], columns=kasva_data.OVERLAY_COLS)
+        df["Error"] = [g["error"] for g in gagal]
+        df["Ditolak"] = pd.to_datetime([g["ditolak"] for g in gagal], unit="s")
+        return df
+
+    def list_kasir(self):
+        return kasva_data.load_kasir()
+
+    def load_deadlines(self):
+        return kasva_data.load_tenggat()
+
+
+class SQLiteBackend(StorageBackend):
+    """Ledger di SQLite dengan index (tanggal) dan (kategori, kasir, tanggal)."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ledger (
+        id INTEGER PRIMARY KEY,
+        tanggal TEXT NOT NULL,          -- ISO YYYY-MM-DD
+        kategori TEXT,
+        kasir TEXT,
+        uraian TEXT,
+        umk INTEGER NOT NULL DEFAULT 0,     -- rupiah utuh
+        spj INTEGER NOT NULL DEFAULT 0,
+        keterangan TEXT
+    );
+    CREATE INDEX IF NOT EXISTS ix_ledger_tanggal ON ledger (tanggal);
+    CREATE INDEX IF NOT EXISTS ix_ledger_kategori_kasir_tanggal ON ledger (kategori, kasir, tanggal);
+    CREATE TABLE IF NOT EXISTS kasir (nama TEXT PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS meta (kunci TEXT PRIMARY KEY, nilai INTEGER NOT NULL);
+    INSERT OR IGNORE INTO meta (kunci, nilai) VALUES ('versi', 0);
+    """
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._status = (None, None, None)     # (versi, ledger, status pelunasan)
+        with closing(self._connect()) as con, con:
+            con.executescript(self.SCHEMA)
+
+    def _connect(self):
+        # Koneksi baru per panggilan: tiap sesi Streamlit jalan di thread sendiri
+        return sqlite3.connect(self.path)
+
+    def data_version(self):
+        # Penghitung di tabel meta, dinaikkan di transaksi yang sama dengan tiap
+        # penulisan (import ulang dengan jumlah baris sama pun tetap versi baru)
+        with closing(self._connect()) as con:
+            return con.execute("SELECT nilai FROM meta WHERE kunci = 'versi'").fetchone()[0]
+
+    @staticmethod
+    def _naikkan_versi(con):
+        con.execute("UPDATE meta SET nilai = nilai + 1 WHERE kunci = 'versi'")
+
+    def _ledger_status(self):
+        # Seluruh ledger + pelunasan FIFO dihitung sekali per versi data (penghitung
+        # meta), bukan tiap rerun halaman Tenggat
+        versi = self.data_version()
+        simpan = self._status
+        if simpan[0] != versi:
+            semua = self.load_ledger()
+            simpan = (versi, semua, hitung_tenggat(semua))
+            self._status = simpan
+        return simpan[1], simpan[2]
+
+    @staticmethod
+    def _where(tahun=None, kategori=None, kasir=None):
+        # Tahun → rentang tanggal supaya tetap kena index tanggal
+        syarat, args = [], []
+        if kategori is not None:
+            syarat.append("kategori = ?")
+            args.append(kategori)
+        if kasir is not None:
+            syarat.append("kasir = ?")
+            args.append(kasir)
+        if tahun is not None:
+            syarat.append("tanggal >= ? AND tanggal < ?")
+            args += [f"{int(tahun):04d}-01-01", f"{int(tahun) + 1:04d}-01-01"]
+        where = " WHERE " + " AND ".join(syarat) if syarat else ""
+        return where, args
+
+    def load_ledger(self, tahun=None, kategori=None, kasir=None):
+        where, args = self._where(tahun, kategori, kasir)
+        sql = ("SELECT tanggal AS Tanggal, kategori AS Kategori, kasir AS Kasir, "
+               "uraian AS Uraian, umk AS UMK, spj AS SPJ, keterangan AS Keterangan "
+               f"FROM ledger{where} ORDER BY id")
+        with closing(self._connect()) as con:
+            df = pd.read_sql_query(sql, con, params=args)
+        df["Tanggal"] = pd.to_datetime(df["Tanggal"], format="%Y-%m-%d")
+        return df
+
+    def distinct(self, kolom, tahun=None, kategori=None):
+        ekspr = {
+            "Tahun": "CAST(substr(tanggal, 1, 4) AS INTEGER)",
+            "Kategori": "kategori",
+            "Kasir": "kasir",
+        }[kolom]
+        where, args = self._where(tahun, kategori)
+        where += (" AND " if where else " WHERE ") + f"{ekspr} IS NOT NULL AND {ekspr} != ''"
+        with closing(self._connect()) as con:
+            rows = con.execute(f"SELECT DISTINCT {ekspr} FROM ledger{where} ORDER BY 1", args)
+            return [r[0] for r in rows]
+
+    def totals(self, tahun=None, kategori=None, kasir=None):
+        where, args = self._where(tahun, kategori, kasir)
+        with closing(self._connect()) as con:
+            umk, spj = con.execute(
+                f"SELECT COALESCE(SUM(umk), 0), COALESCE(SUM(spj), 0) FROM ledger{where}", args
+            ).fetchone()
+        return int(umk), int(spj)
+
+    def opening_balance(self, tanggal, kategori=None, kasir=None):
+        where, args = self._where(kategori=kategori, kasir=kasir)
+        where += (" AND " if where else " WHERE ") + "tanggal < ?"
+        args.append(pd.Timestamp(tanggal).strftime("%Y-%m-%d"))
+        with closing(self._connect()) as con:
+            (saldo,) = con.execute(
+                f"SELECT COALESCE(SUM(umk), 0) - COALESCE(SUM(spj), 0) FROM ledger{where}", args
+            ).fetchone()
+        return int(saldo)
+
+    def rollup(self, by, tahun=None, kategori=None, kasir=None):
+        by = [by] if isinstance(by, str) else list(by)
+        ekspr = {
+            "Tahun": "CAST(substr(tanggal, 1, 4) AS INTEGER)",
+            "Bulan": "CAST(substr(tanggal, 6, 2) AS INTEGER)",
+            "Kategori": "kategori",
+            "Kasir": "kasir",
+            "Uraian": "uraian",
+        }
+        kolom = ", ".join(f"{ekspr[b]} AS {b}" for b in by)
+        where, args = self._where(tahun, kategori, kasir)
+        sql = (f"SELECT {kolom}, SUM(umk) AS UMK, SUM(spj) AS SPJ, COUNT(*) AS Transaksi "
+               f"FROM ledger{where} GROUP BY {', '.join(ekspr[b] for b in by)} ORDER BY 1")
+        with closing(self._connect()) as con:
+            df = pd.read_sql_query(sql, con, params=args)
+        # Sama seperti backend lain: grup kosong/NULL tidak ikut
+        df = df.replace("", pd.NA).dropna(subset=by)
+        return df.reset_index(drop=True)
+
+    def append_transaction(self, tanggal, kategori, kasir, uraian, umk, spj, keterangan=""):
+        with closing(self._connect()) as con, con:
+            cur = con.execute(
+                "INSERT INTO ledger (tanggal, kategori, kasir, uraian, umk, spj, keterangan) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tanggal.strftime("%Y-%m-%d"), kategori or None, kasir or None,
+                 uraian, umk, spj, keterangan),
+            )
+            self._naikkan_versi(con)
+            return cur.lastrowid
+
+    def list_kasir(self):
+        with closing(self._connect()) as con:
+            return [r[0] for r in con.execute("SELECT nama FROM kasir ORDER BY rowid")]
+
+    def load_deadlines(self):
+        with closing(self._connect()) as con:
+            try:
+                return pd.read_sql_query("SELECT * FROM tenggat", con)
+            except pd.errors.DatabaseError:
+                return pd.DataFrame()
+
+    def import_frames(self, ledger, kasir=(), tenggat=None):
+        """Isi ulang database dari DataFrame (mis. hasil kasva.data.load_bundle()).
+
+        Baris yang Tanggal-nya tidak terbaca (NaT) dilewati, sama seperti di dashboard.
+        """
+        rows = ledger.reindex(columns=LEDGER_COLS)
+        rows = rows[rows["Tanggal"].notna()]
+        records = [
+            (tgl.strftime("%Y-%m-%d"), kat or None, ksr or None, ur, int(u or 0),
+             int(s or 0), ket if isinstance(ket, str) else "")
+            for tgl, kat, ksr, ur, u, s, ket in rows.itertuples(index=False)
+        ]
+        with closing(self._connect()) as con, con:
+            con.execute("DELETE FROM ledger")
+            con.executemany(
+                "INSERT INTO ledger (tanggal, kategori, kasir, uraian, umk, spj, keterangan) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                records,
+            )
+            con.execute("DELETE FROM kasir")
+            con.executemany("INSERT OR IGNORE INTO kasir (nama) VALUES (?)", [(k,) for k in kasir])
+            if tenggat is not None:
+                tenggat.to_sql("tenggat", con, if_exists="replace", index=False)
+            self._naikkan_versi(con)
+
+
+@st.cache_resource(show_spinner=False)
+def get_backend(nama=BACKEND):
+    """Backend aktif (satu objek per proses)."""
+    if nama == "sqlite":
+        return SQLiteBackend()
+    if nama == "gsheets":
+        return GoogleSheetsBackend()
+    raise ValueError(f"KASVA_BACKEND tidak dikenal: {nama!r}")
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from kasva.ledger import gabung_ledger
+
+# ------------------------
+# SINKRON INKREMENTAL SHEET DATA
+# Sheet Data praktis append-only (baris baru ditambah dari form tambah_data),
+# jadi cukup ambil baris setelah watermark. Beberapa baris terakhir ikut
+# diambil ulang dan dicek checksum-nya: kalau berubah berarti ada edit di atas
+# watermark → reload penuh.
+# ------------------------
+
+# Jumlah baris ekor yang dicek ulang tiap sinkron
+TAIL_ROWS = int(os.environ.get("KASVA_SYNC_TAIL", "20"))
+
+# Paksa reload penuh berkala (detik) untuk menangkap edit jauh di atas ekor
+FULL_SYNC_EVERY = int(os.environ.get("KASVA_FULL_SYNC", "3600"))
+
+
+def _checksum(rows):
+    return hashlib.sha1(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class LedgerSync:
+    """Watermark + frame hasil sinkron sheet Data (satu objek per proses)."""
+
+    def __init__(self, sheet="Data", cols=("A", "H"), parse=None):
+        self.sheet = sheet
+        self.cols = cols
+        self.parse = parse          # grid (header + baris) → DataFrame bersih
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.header = []
+        self.n_rows = 0             # jumlah baris grid yang sudah tersinkron (termasuk header)
+        self.tail = []              # baris mentah terakhir (maks TAIL_ROWS)
+        self.frame = pd.DataFrame()
+        self.last_full = 0.0
+
+    def dump(self):
+        """Watermark dalam bentuk JSON-able (untuk disimpan di mirror lokal)."""
+        return {"header": self.header, "n_rows": self.n_rows,
+                "tail": self.tail, "last_full": self.last_full}
+
+    def restore(self, meta, frame):
+        # Lanjut dari snapshot mirror → sinkron berikutnya tetap inkremental
+        self.header = list(meta["header"])
+        self.n_rows = int(meta["n_rows"])
+        self.tail = [list(r) for r in meta["tail"]]
+        self.last_full = float(meta["last_full"])
+        self.frame = frame
+
+    def _start_row(self):
+        # Baris sheet (1-based) pertama yang diambil; overlap dengan ekor yang disimpan
+        return max(2, self.n_rows - len(self.tail) + 1)
+
+    def next_range(self):
+        """Range A1 yang perlu diambil pada sinkron berikutnya."""
+        awal, akhir = self.cols
+        full = (not self.n_rows
+                or time.time() - self.last_full > FULL_SYNC_EVERY)
+        if full:
+            self.reset()
+            return f"'{self.sheet}'!{awal}:{akhir}"
+        return f"'{self.sheet}'!{awal}{self._start_row()}:{akhir}"
+
+    def _normalize(self, rows):
+        # Sel dibiarkan bertipe asli (angka dari UNFORMATTED_VALUE tidak dijadikan teks)
+        lebar = len(self.header)
+        return [(r + [""] * (lebar - len(r)))[:lebar] for r in rows]
+
+    def apply(self, grid):
+        """Terapkan hasil fetch dari ``next_range()``.
+
+        Return False kalau ekor tidak cocok (ada edit/hapus di atas watermark);
+        pemanggil harus ``reset()`` lalu fetch ulang penuh.
+        """
+        if not self.n_rows:
+            if not grid:
+                return True
+            self.header = [str(h) for h in grid[0]]
+            rows = self._normalize(grid[1:])
+            self.frame = self.parse([self.header] + rows)
+            self.n_rows = len(grid)
+            self.tail = rows[-TAIL_ROWS:]
+            self.last_full = time.time()
+            return True
+
+        rows = self._normalize(grid)
+        overlap = len(self.tail)
+        if len(rows) < overlap or _checksum(rows[:overlap]) != _checksum(self.tail):
+            return False
+
+        baru = rows[overlap:]
+        if baru:
+            self.frame = gabung_ledger([self.frame, self.parse([self.header] + baru)])
+            self.n_rows += len(baru)
+            self.tail = (self.tail + baru)[-TAIL_ROWS:]
+        return True
@@ -0,0 +1,121 @@
+import pandas as pd
+import streamlit as st
+
+# ------------------------
+# TAMPILAN TABEL
+# Kolom uang dikirim ke browser tetap angka (int64 di payload Arrow) dan baru
+# diformat di sisi klien lewat column_config → tidak ada string per sel,
+# payload lebih kecil, dan sort kolom tetap numerik.
+# "localized" ikut locale browser (id-ID → 1.250.000).
+# ------------------------
+
+KOLOM_RUPIAH = ("UMK", "SPJ", "Sisa Saldo")
+
+
+def config_rupiah(kolom=KOLOM_RUPIAH):
+    """column_config untuk kolom rupiah: angka dengan pemisah ribuan, label "(Rp)"."""
+    return {k: st.column_config.NumberColumn(f"{k} (Rp)", format="localized") for k in kolom}
+
+
+def kosongkan_nol(df, kolom=KOLOM_RUPIAH):
+    """Nilai 0 jadi sel kosong (dulu tampil "-"); kolom tetap bertipe angka."""
+    for k in kolom:
+        if k in df.columns:
+            df[k] = df[k].astype("Int64").mask(df[k] == 0)
+    return df
+
+
+# ------------------------
+# HALAMAN TABEL (server-side)
+# Hanya baris di halaman aktif yang dikirim ke browser; sort dan loncat ke
+# tanggal dikerjakan di server atas seluruh hasil filter.
+# ------------------------
+
+UKURAN_HALAMAN = (25, 50, 100, 250)
+
+
+def halaman(df, key, kolom_sort, default_sort="Tanggal"):
+    """Kontrol halaman + potongan baris ``df`` untuk halaman aktif.
+
+    ``key`` membedakan state widget antar tabel. Return DataFrame berisi baris
+    halaman ini saja (index asli dipertahankan).
+    """
+    c1, c2, c3, c4, c5 = st.columns([1, 1.2, 1, 1.3, 1])
+    with c1:
+        ukuran = st.selectbox("Baris per halaman", UKURAN_HALAMAN, index=1, key=f"{key}_ukuran")
+    with c2:
+        urut = st.selectbox("Urutkan", kolom_sort, index=kolom_sort.index(default_sort),
+                            key=f"{key}_urut")
+    with c3:
+        turun = st.toggle("Menurun", key=f"{key}_turun")
+    df = df.sort_values(urut, ascending=not turun, kind="stable", na_position="last")
+    n_hal = max(1, -(-len(df) // ukuran))
+
+    k_hal = f"{key}_hal"
+    with c4:
+        loncat = None
+        if urut == "Tanggal":
+            loncat = st.date_input("Loncat ke tanggal", value=None, format="DD-MM-YYYY",
+                                   key=f"{key}_loncat")
+    # Halaman diatur sebelum widget-nya dibuat: loncat hanya saat tanggal diganti,
+    # dan dijepit ke rentang baru kalau filter mengubah jumlah halaman
+    if loncat is not None and loncat != st.session_state.get(f"{key}_loncat_lama"):
+        tgl = df["Tanggal"].to_numpy()
+        batas = pd.Timestamp(loncat).to_datetime64()
+        pos = int((tgl > batas).sum() if turun else (tgl < batas).sum())
+        st.session_state[k_hal] = pos // ukuran + 1
+    st.session_state[f"{key}_loncat_lama"] = loncat
+    st.session_state[k_hal] = min(max(1, st.session_state.get(k_hal, 1)), n_hal)
+    with c5:
+        hal = st.number_input(f"Halaman (dari {n_hal})", min_value=1, max_value=n_hal,
+                              step=1, key=k_hal)
+
+    awal = (hal - 1) * ukuran
+    potong = df.iloc[awal:awal + ukuran]
+    if len(df):
+        st.caption(f"Baris {awal + 1:,}–{awal + len(potong):,} dari {len(df):,}".replace(",", "."))
+    return potong
+
+
+# ------------------------
+# TABEL HTML TENGGAT WAKTU
+# Sisa Hari diberi warna (merah ≤5, kuning ≤10, hijau ≤21), kolom Link jadi
+# tombol WhatsApp.
+# ------------------------
+
+
+def warna_sisa_hari(sisa):
+    try: sisa = int(sisa)
+    except: return "#9d8c8c"
+    if sisa <= 5: return "#e74c3c"
+    elif 5 < sisa <= 10: return "#f1c40f"
+    elif 10 < sisa <= 21: return "#2ecc71"
+    else: return "#ffffff"
+
+
+def tabel_tenggat_html(df_tw):
+    """DataFrame sheet Tenggat Waktu → string tabel HTML untuk st.markdown."""
+    html = "<table style='width:100%; border-collapse: collapse;'>"
+    html += "<tr style='background-color:#4F46E5; color:white;'>"
+    for col in df_tw.columns:
+        html += f"<th style='padding:10px; border:1px solid #ddd; text-align:center;'>{col}</th>"
+    html += "</tr>"
+
+    for i, row in df_tw.iterrows():
+        html += "<tr>"
+        for col in df_tw.columns:
+            val = row[col]
+            if col == "Link" and pd.notna(val) and str(val).startswith("http"):
+                val = f'<a href="{val}" target="_blank"><button style="background-color:#43C354; color:white; padding:4px 10px; border:none; border-radius:5px; cursor:pointer;"><img width="20" height="20" src="https://img.icons8.com/color/48/whatsapp--v1.png"/></button></a>'
+            elif col == "Sisa Hari":
+                color = warna_sisa_hari(val)
+                # Text disesuaikan agar kontras dengan warna background
+                text_color = "white" if color in ["#e74c3c", "#2ecc71"] else "black"
+                val = f"<div style='background-color:{color}; color:{text_color}; padding:6px; font-weight:bold; border-radius:4px; text-align:center;'>{val} Hari</div>"
+            elif col == "No":
+                val = f"<div style='text-align:center;'>{val}</div>"
+
+            html += f"<td style='padding:8px; border:1px solid #ddd; text-align:center;'>{val}</td>"
+        html += "</tr>"
+    html += "</table>"
+    return html
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from kasva.ledger import kode_grup
+
+# ------------------------
+# TENGGAT WAKTU: pelunasan UMK oleh SPJ secara FIFO
+# Per grup (Kategori, Kasir), SPJ selalu melunasi UMK yang paling lama dulu.
+# UMK ke-i lunas ketika kumulatif SPJ >= kumulatif UMK s/d baris i, jadi
+# tanggal lunasnya cukup dicari dengan searchsorted (n log n, tanpa loop per baris).
+# ------------------------
+
+TENGGAT_HARI = 21
+
+
+def hitung_tenggat(df, by=("Kategori", "Kasir"), hari=TENGGAT_HARI):
+    """Status pelunasan tiap baris UMK.
+
+    Hasilnya DataFrame sejajar dengan index ``df`` berisi kolom:
+    "Sisa UMK" (bagian UMK yang belum di-SPJ-kan), "Tanggal Lunas"
+    (NaT kalau belum lunas) dan "Tenggat Waktu" (Tanggal + ``hari``).
+    Baris yang bukan UMK berisi NaN/NaT.
+    """
+    n = len(df)
+    sisa_umk = np.full(n, np.nan)
+    lunas = np.full(n, np.datetime64("NaT"), dtype="datetime64[ns]")
+    tenggat = np.full(n, np.datetime64("NaT"), dtype="datetime64[ns]")
+
+    if n:
+        tgl = df["Tanggal"].to_numpy(dtype="datetime64[ns]")
+        codes = kode_grup(df, list(by))
+        # Urut per grup lalu Tanggal (lexsort stabil → urutan input jadi penentu kalau tanggal sama)
+        order = np.lexsort((tgl, codes))
+        c = codes[order]
+        t = tgl[order]
+        umk = df["UMK"].to_numpy(dtype=float)[order]
+        spj = df["SPJ"].to_numpy(dtype=float)[order]
+
+        out_sisa = np.full(n, np.nan)
+        out_lunas = np.full(n, np.datetime64("NaT"), dtype="datetime64[ns]")
+
+        batas = np.flatnonzero(np.diff(c)) + 1
+        for awal, akhir in zip(np.r_[0, batas], np.r_[batas, n]):
+            u = umk[awal:akhir]
+            adv = np.flatnonzero(u > 0)
+            if adv.size == 0:
+                continue
+            cum_umk = np.cumsum(u)[adv]
+            cum_spj = np.maximum.accumulate(np.cumsum(spj[awal:akhir]))
+
+            out_sisa[awal + adv] = np.clip(cum_umk - cum_spj[-1], 0, u[adv])
+
+            j = np.searchsorted(cum_spj, cum_umk, side="left")
+            ok = j < cum_spj.size
+            tg = t[awal:akhir]
+            # SPJ yang tercatat sebelum UMK-nya tetap dianggap lunas di tanggal UMK
+            out_lunas[awal + adv[ok]] = np.maximum(tg[j[ok]], tg[adv[ok]])
+
+        sisa_umk[order] = out_sisa
+        lunas[order] = out_lunas
+        is_umk = df["UMK"].to_numpy(dtype=float) > 0
+        tenggat[is_umk] = tgl[is_umk] + np.timedelta64(hari, "D")
+
+    return pd.DataFrame(
+        {"Sisa UMK": sisa_umk, "Tanggal Lunas": lunas, "Tenggat Waktu": tenggat},
+        index=df.index,
+    )